@@ -9,7 +9,7 @@
 #    Requires:     Python3        - Platform Specific Install
 #                  Tkinter        - Platform Specific, e.g., python3-tk
 #                  tesseractocr   - Platform Specific Install
-#                  PDFtk Server   - Platform Specific Install
+#                  PDFtk Server   - Platform Specific Install (only if pypdf is not installed)
 #                  PySimpleGUI    - pip install PySimpleGUI
 #                  pyinsane2      - pip install pyinsane2
 #                  Pillow         - pip install Pillow
@@ -18,13 +18,48 @@
 #                  pyocr          - pip install pyocr
 #                  pypdftk        - pip install pypdftk
 #                  img2pdf        - pip install img2pdf
+#                  pypdf          - pip install pypdf (in-process merge, pdftk is used without it)
 #                  playsound      - pip install playsound (audio feedback)
 #                  *** Some platforms use pip3 instead of pip for install ***
 #    Optional:     Sounds from Package 'sound-theme-freedesktop' or similar
 #                  Windows Sounds from C:\Windows\Media\
 #                  A PDF Viewer of Some Sort, e.g., Adobe PDF Reader, MuPDF, Evince
 #
+#    Usage:        Scan2PDF.py                    - Graphical Window
+#                  Scan2PDF.py --headless [...]   - Scan Without a Window, See --help for Options
+#                  Scan2PDF.py --job SPEC [...]   - Queue Documents on One or More Scanners, One --job per Document
+#                  Scan2PDF.py --ingest DIR [...] - OCR and Merge Folders of Existing Images into PDF Files
+#                  Scan2PDF.py --benchmark [...]  - Time Each Pipeline Stage on Simulated Pages
+#
+#    Environment:  SCAN2PDF_OCR_WORKERS - Number of Pages to OCR Concurrently (Default: CPU Cores)
+#                  SCAN2PDF_QUEUE_DEPTH - Pages Allowed to Wait Between Pipeline Stages (Default: 2)
+#                  SCAN2PDF_IN_MEMORY   - Pass Pages to OCR/img2pdf from Memory, 0 to Disable (Default: 1)
+#                  SCAN2PDF_SPILL_MB    - Page Data Held in Memory Before Spilling to Disk (Default: 512)
+#                  SCAN2PDF_BACKEND     - Scanner Backend, 'pyinsane2' or 'virtual:...' (Default: pyinsane2)
+#                  SCAN2PDF_METRICS     - Metrics File, JSON Lines or Prometheus Textfile If Named *.prom
+#                  SCAN2PDF_DEVICE_TTL  - Seconds to Reuse the Cached Scanner List (Default: 3600)
+#                  SCAN2PDF_RELEASE_PAGES - Release Pages Once Queued for Encoding, 0 to Keep Them (Default: 1)
+#                  SCAN2PDF_ENCODING    - Page Images in the PDF, 'adaptive' or 'lossless' (Default: adaptive)
+#                  SCAN2PDF_JPEG_QUALITY - JPEG Quality of Photographic Pages (Default: 85)
+#                  SCAN2PDF_BITONAL_MIDTONES - Fraction of Midtone Pixels Below Which a Page is Stored as
+#                                         Black and White (Default: 0.06)
+#                  SCAN2PDF_BLANK_PAGES - Blank Pages are 'keep' (Without OCR), 'drop' or 'ocr' (Default: keep)
+#                  SCAN2PDF_BLANK_INK   - Fraction of a Page Covered by Ink Below Which It is Blank (Default: 0.001)
+#                  SCAN2PDF_SCAN_DPI    - Resolution Pages are Scanned At (Default: 300)
+#                  SCAN2PDF_IMAGE_DPI   - Resolution of Page Images in the PDF, 0 for As Scanned (Default: 0)
+#                  SCAN2PDF_OCR_DPI     - Resolution Pages are OCR'd At, 0 for As Scanned (Default: 0) - e.g., 200
+#                                         for Clean Office Documents; Only Used with Adaptive Encoding
+#                  SCAN2PDF_AUTOCROP    - Crop Full Scan Area Pages to the Paper or Content, 0 to Disable (Default: 1)
+#                  SCAN2PDF_DESKEW      - Straighten Crooked Pages, 1 to Enable (Default: 0)
+#                  SCAN2PDF_UI_FPS      - Most Times per Second Status is Drawn in the Window (Default: 20)
+#                  SCAN2PDF_OCR_CACHE_MB - Size of the Cache of OCR Results for Repeated Pages, 0 to Disable
+#                                         (Default: 256)
+#                  PDFTK_PATH           - Location of pdftk.exe (Windows Only)
+#
 #    Testing:      Tested with Multiple HP OfficeJet Printers
+#                  Failure Handling: a Simulated Jam While OCR is Still Queued Must Fail Promptly, Not Hang
+#                      SCAN2PDF_OCR_WORKERS=1 Scan2PDF.py --headless --source adf --output /tmp/jam.pdf
+#                          --backend 'virtual:pages=8,dpi=100,jam=4'    (Small Pages Outpace OCR)
 #
 #  Copyright 2018 Gregory W. Russell <grussell86@yahoo.com>
 #
@@ -47,21 +82,109 @@
 
 
 def main(args):
+    import time
+    startclock = time.perf_counter()    # Startup Milestones are Timed from Here
     import sys
-    import PySimpleGUI as sg
-    import pyinsane2
-    import PIL.Image
-    import pyocr
-    import pypdftk
-    import img2pdf
+    import os
+    # Limit Each Tesseract Instance to a Single Thread - Pages are OCR'd Concurrently Instead
+    #    Must Be Set Before libtesseract is Loaded
+    os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+    import argparse
+    import json
+
+    # Parse Command-line Options - With No Options the Graphical Launcher is Started
+    parser = argparse.ArgumentParser(
+        description='Scan a Document and Output to a PDF File with Optional OCR')
+    parser.add_argument('--headless', action='store_true',
+                        help='scan without the graphical window, e.g., from cron or systemd')
+    parser.add_argument('--list-scanners', action='store_true',
+                        help='list available scanners and exit (implies --headless)')
+    parser.add_argument('--scanner', default='',
+                        help='scanner name or part of it (default: first scanner found)')
+    parser.add_argument('--refresh-scanners', action='store_true',
+                        help='search for scanners again instead of using the cached device list')
+    parser.add_argument('--source', choices=['glass', 'adf'], default='glass',
+                        help='scanner glass or automatic document feeder (default: glass)')
+    parser.add_argument('--ocr', dest='ocr', action='store_true', default=True,
+                        help='OCR the document after scanning (default)')
+    parser.add_argument('--no-ocr', dest='ocr', action='store_false',
+                        help='do not OCR the document')
+    parser.add_argument('--color', action='store_true',
+                        help='scan in color instead of gray')
+    parser.add_argument('--paper', choices=['letter', 'max'], default='letter',
+                        help='crop to letter size paper or use the maximum scan area (default: letter)')
+    parser.add_argument('--deskew', action='store_true', default=os.getenv('SCAN2PDF_DESKEW', '0') not in ('', '0'),
+                        help='straighten pages fed in crooked before OCR (default: off)')
+    parser.add_argument('--output', default=None,
+                        help='output PDF file or directory (default: ~/PDF/scan_<date-time>.pdf)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='number of pages to OCR concurrently (default: CPU cores)')
+    parser.add_argument('--backend', default=os.getenv('SCAN2PDF_BACKEND', 'pyinsane2'),
+                        help="scanner backend: 'pyinsane2' (default) or a simulated scanner, e.g., "
+                             "'virtual:pages=20,size=8.5x11,dpi=300,mode=Gray,ppm=30,devices=2' or "
+                             "'virtual:images=DIR' - jam=N fails the feed at page N")
+    parser.add_argument('--benchmark', action='store_true',
+                        help='time the pipeline on simulated 300 dpi pages and exit (implies --headless)')
+    parser.add_argument('--benchmark-pages', type=int, default=10,
+                        help='pages per benchmark scenario (default: 10)')
+    parser.add_argument('--benchmark-images', default=None,
+                        help='directory of sample page images to use instead of synthetic pages')
+    parser.add_argument('--benchmark-output', default=None,
+                        help='file to save benchmark results to (default: scan2pdf-benchmark-<date-time>.json)')
+    parser.add_argument('--benchmark-compare', default=None,
+                        help='earlier benchmark results file to check for regressions')
+    parser.add_argument('--benchmark-tolerance', type=float, default=10.0,
+                        help='percent slowdown reported as a regression (default: 10)')
+    parser.add_argument('--metrics', default=os.getenv('SCAN2PDF_METRICS'),
+                        help='file to record page, stage and command timings in: JSON lines, or a '
+                             'Prometheus textfile if the name ends in .prom')
+    parser.add_argument('--job', action='append', default=[], metavar='SPEC',
+                        help="queue documents on one or more scanners (implies --headless), one --job per "
+                             "document - each is scanned while the ones before it are OCR'd and merged, "
+                             "e.g., 'scanner=OfficeJet 8600,source=adf,output=FILE' - ocr=yes|no, color=yes|no "
+                             "and paper=letter|max may also be given, anything else comes from the other options")
+    parser.add_argument('--ingest', default=None, metavar='SOURCE',
+                        help='OCR and merge existing image files into PDF files in the --output directory instead '
+                             'of scanning (implies --headless): a directory tree, or a manifest listing one image '
+                             'per line, optionally followed by a tab and the name of its document')
+    parser.add_argument('--group-pattern', default=None, metavar='REGEX',
+                        help='with --ingest, group the images in a folder into documents by the part of the file '
+                             'name matched by the first group of REGEX, e.g., "^(.+)_p[0-9]+" '
+                             '(default: one document per folder)')
+    parser.add_argument('--ingest-workers', type=int, default=2,
+                        help='with --ingest, number of documents processed at once (default: 2)')
+    parser.add_argument('--force', action='store_true',
+                        help='with --ingest, also process documents whose output is newer than their images')
+    parser.add_argument('--blank-pages', choices=['keep', 'drop', 'ocr'],
+                        default=os.getenv('SCAN2PDF_BLANK_PAGES', 'keep'),
+                        help='blank pages are kept without OCR, dropped, or OCR\'d like any other page '
+                             '(default: keep)')
+    parser.add_argument('--log', choices=['json', 'text'], default='json',
+                        help='headless progress format: JSON lines or plain text (default: json)')
+    cmdargs = parser.parse_args(args[1:])
+    headless = (cmdargs.headless or cmdargs.list_scanners or cmdargs.benchmark or len(cmdargs.job) > 0 or
+                cmdargs.ingest is not None)
+
+    # Headless Mode Runs Without Tk - Only Load the GUI Toolkit When the Window is Used
+    if headless:
+        sg = None
+    else:
+        import PySimpleGUI as sg
+    import types
+    import importlib.util
     import subprocess
     import shutil
     import tempfile
     import datetime
     import re
-    import os
+    import threading
+    import hashlib
+    import io
+    import queue
+    import concurrent.futures
     from time import sleep
-    from playsound import playsound
+    # Imaging, PDF and OCR Modules are Imported by the First Code Path Needing Them - See ImportModules()
+    PIL = numpy = img2pdf = pypdf = pyocr = pypdftk = None
 
     if os.name == 'nt':
         try:
@@ -80,6 +203,75 @@ def main(args):
             if not os.path.isfile(PDFTK_PATH):
                 PDFTK_PATH = ''
 
+    def EnvOption(envvar, default, convert=int):
+        # Read a Tunable Option from the Environment, Falling Back to the Default If Unset or Invalid
+        try:
+            return(convert(os.getenv(envvar, default)))
+        except ValueError:
+            return(default)
+
+    # Tunable Options - Defaults May Be Overridden with Environment Variables
+    options = {
+        # Number of Pages to OCR Concurrently - Defaults to One Worker per CPU Core
+        'ocr_workers': max(1, EnvOption('SCAN2PDF_OCR_WORKERS', os.cpu_count() or 1)),
+        # Number of Scanned Pages Allowed to Wait Between Pipeline Stages
+        'queue_depth': max(1, EnvOption('SCAN2PDF_QUEUE_DEPTH', 2)),
+        # Pass Pages to OCR and img2pdf from Memory Instead of Round-Tripping Through TIFF Files
+        'in_memory': EnvOption('SCAN2PDF_IN_MEMORY', 1) != 0,
+        # Megabytes of Page Data Held in Memory Before Further Pages Spill to the Working Directory
+        'spill_mb': max(0, EnvOption('SCAN2PDF_SPILL_MB', 512)),
+        # Release Each Page from the Scan Session Once It is Handed Downstream
+        'release_pages': EnvOption('SCAN2PDF_RELEASE_PAGES', 1) != 0,
+        # Page Images are Encoded to Suit Their Content ('adaptive') or Always as PNG ('lossless')
+        'encoding': os.getenv('SCAN2PDF_ENCODING', 'adaptive').lower(),
+        'jpeg_quality': min(95, max(10, EnvOption('SCAN2PDF_JPEG_QUALITY', 85))),
+        # Pages with Fewer Midtone (Neither Paper Nor Ink) Pixels than This are Black and White Text
+        'bitonal_midtones': EnvOption('SCAN2PDF_BITONAL_MIDTONES', 0.06, float),
+        # Blank Sheets (Duplex Backs, Separators) are Kept Without OCR, Dropped, or OCR'd ('keep', 'drop', 'ocr')
+        'blank_pages': cmdargs.blank_pages,
+        'blank_ink': EnvOption('SCAN2PDF_BLANK_INK', 0.001, float),
+        # Pages are Scanned at One Resolution, Then Downsampled Separately for the PDF and for OCR
+        #    OCR Time Grows with the Pixel Count - Clean Text Needs Less Resolution than the Archive Image
+        'scan_dpi': min(1200, max(75, EnvOption('SCAN2PDF_SCAN_DPI', 300))),
+        'image_dpi': max(0, EnvOption('SCAN2PDF_IMAGE_DPI', 0)),
+        'ocr_dpi': max(0, EnvOption('SCAN2PDF_OCR_DPI', 0)),
+        # Full Scan Area Pages are Cropped to the Paper or Printed Area, Skipping Bare Scanner Bed
+        'autocrop': EnvOption('SCAN2PDF_AUTOCROP', 1) != 0,
+        # Crooked Pages are Straightened After Cropping
+        'deskew': cmdargs.deskew,
+        # Megabytes of OCR Results Kept for Pages Seen Before - the Least Recently Used are Evicted
+        'ocr_cache_mb': max(0, EnvOption('SCAN2PDF_OCR_CACHE_MB', 256)),
+        # Report Progress as Log Lines Instead of Updating the Window
+        'headless': headless,
+        # Most Times per Second the Window is Redrawn with Queued Status Lines
+        'ui_fps': min(60, max(1, EnvOption('SCAN2PDF_UI_FPS', 20))),
+        'log_format': cmdargs.log,
+        'log_status': True,
+        # Seconds a Discovered Device List is Reused Before Scanners are Searched for Again
+        'device_ttl': max(0, EnvOption('SCAN2PDF_DEVICE_TTL', 3600)),
+        # Optional File Receiving Instrumentation Records
+        'metrics': cmdargs.metrics,
+    }
+    if cmdargs.workers is not None:
+        options['ocr_workers'] = max(1, cmdargs.workers)
+    loglock = threading.Lock()
+    timinglock = threading.Lock()
+    metricslock = threading.Lock()
+    devicelock = threading.RLock()
+    # Devices Found by the Backend and the Persistent Cache Entry for It
+    devicecache = {'initialized': False, 'devices': None, 'time': 0, 'backend': '', 'saved': None}
+    ocrcachelock = threading.Lock()
+    ocrcache = {'engine': None, 'size': None}    # OCR Engine Version, Bytes in the Cache Directory
+    failures = []    # Errors Reported in Headless Mode, Used for the Exit Status
+    # Scan Jobs - Each Runs in Its Own Thread, with OCR from Every Job Sharing One Worker Pool
+    jobcontext = threading.local()    # The Job Run by the Current Thread, If Any
+    scheduler = {'pool': None, 'jobs': [], 'devices': {}, 'lock': threading.Lock()}
+    importlock = threading.Lock()
+    imported = set()    # Module Groups Already Imported by ImportModules()
+    startup = {}        # Seconds from Startup to Each Milestone, for the Startup Timing Report
+    # Window Updates from Every Thread, Drawn by the Window Thread - See RenderOutput()
+    uievents = queue.Queue()
+
     def Launcher():
         # Output Location for Scanned Document - PDF Folder in Home Directory
         outputdir = os.path.join(os.path.expanduser('~'), 'PDF')
@@ -94,7 +286,8 @@ def main(args):
         with sg.Window('Scan Document to PDF', default_button_element_size=(8,1), auto_size_buttons=True, auto_size_text=False, default_element_size=(26,1)) as window:
             layout = [[sg.Frame('Document Source', [
                           [sg.Text('Scanner: ', size=(7, 1)), 
-                           sg.InputCombo(('Searching...'), size=(50, 1), key='scanner')],
+                           sg.InputCombo(('Searching...'), size=(50, 1), key='scanner'),
+                           sg.ReadButton('Refresh', key='Refresh')],
                           [sg.Radio('Scanner Glass', 'RADIO1', key='glass', default=True), 
                            sg.Radio('Automatic Document Feeder', 'RADIO1', key='adf'), ]]),
                        sg.ReadButton('Clear', key='Clear'), 
@@ -114,43 +307,49 @@ def main(args):
             # Disable Input to Output Status Field
             window.FindElement('output').Update(disabled=True)
 
-            # Disable All Elements During Initial Search for Scanners
-            keys = ['scanner', 'glass', 'adf', 'Clear', 'Scan', 'ocr', 'view', 'letter', 'color']
-            for key in keys:
-                window.FindElement(key).Update(disabled=True)
-            window.Refresh()
-
-            # Get a List of Available Scanners
-            scanners = []
-            try:
-                pyinsane2.init()
-                devices = pyinsane2.get_devices()
-                for i in range(0, len(devices)):
-                    if devices[i].dev_type.find('scanner') > -1 or devices[i].dev_type.find('all-in-one') > -1:
-                        scanners.append(devices[i].nice_name)
-                pyinsane2.exit()
-            except:
-                pass
-
-            # Add the List of Scanners to the Input Combo
-            if len(scanners) == 0:
-                window.FindElement('scanner').Update(values=['Unable to Locate a Scanner'], disabled=False)
+            # Show the Scanners Saved by an Earlier Run at Once, If the List is Still Fresh - Otherwise
+            #    Scanners are Searched for in the Background and Listed When Found
+            keys = ['scanner', 'Refresh', 'glass', 'adf', 'Clear', 'Scan', 'ocr', 'view', 'letter', 'color']
+            scanners = [] if cmdargs.refresh_scanners else FindScanners(cached=True)
+            if len(scanners) > 0:
+                ListScanners(window, scanners, keys)
             else:
-                window.FindElement('scanner').Update(values=scanners, disabled=False)
-                # Enable All Input Fields
-                for key in keys:
-                    window.FindElement(key).Update(disabled=False)
+                # Nothing to Scan On Until a Scanner is Listed
+                window.FindElement('scanner').Update(disabled=True)
+                window.FindElement('Refresh').Update(disabled=True)
+                window.FindElement('Scan').Update(disabled=True)
+            window.Refresh()
+            discovery = StartDiscovery(refresh=cmdargs.refresh_scanners, search=len(scanners) == 0)
 
-            if os.name == 'nt' and ((len(tesseract) == 0) or (len(PDFTK_PATH) == 0)):
+            if os.name == 'nt' and ((len(tesseract) == 0) or
+                                    (len(PDFTK_PATH) == 0 and importlib.util.find_spec('pypdf') is None)):
                 window.FindElement('ocr').Update(False, disabled=True)
                 UpdateOutput(window, "Unable to Locate 'tesseract-ocr/pdftk' --> OCR is Disabled\n\n")
+            StartupMark('window')
 
             # Loop Taking in User Input and Using It
+            #    Waiting for Input at Most One Frame at a Time, so Status from the Scan Jobs is Drawn in
+            #    Batches at the Frame Rate Instead of One Redraw per Line
+            frame = 1.0 / options['ui_fps']
+            rendered = 0
+            jobs = []
+            waiting = []    # Settings of Scans Asked for During a Search, Started Once It Finishes
             while True:
-                (button, values) = window.ReadNonBlocking()
+                (button, values) = window.Read(timeout=int(frame * 1000))
                 if values is None or button == 'Exit':    # If the X Button or Exit Button is Clicked, Just Exit
                     break
-                elif button == 'Clear':                   # Reset Controls to Their Default Values or Exit If ButtonText is 'Exit'
+                if time.perf_counter() - rendered >= frame:
+                    RenderOutput(window)
+                    rendered = time.perf_counter()
+                if discovery['thread'] is not None and not discovery['thread'].is_alive():
+                    FinishDiscovery(window, discovery, keys)
+                    for scanvalues in waiting:
+                        if discovery['search'] and len(discovery['scanners']) == 0:
+                            UpdateOutput(window, 'Unable to Locate a Scanner - Scan Not Started\n')
+                        else:
+                            QueueScan(window, outputdir, jobs, scanvalues)
+                    waiting = []
+                if button == 'Clear':                   # Reset Controls to Their Default Values or Exit If ButtonText is 'Exit'
                     if window.FindElement('Clear').GetText() == 'Exit':
                         break
                     window.FindElement('glass').Update(True)
@@ -159,114 +358,1129 @@ def main(args):
                     window.FindElement('letter').Update(True)
                     window.FindElement('color').Update(False)
                     UpdateOutput(window, None, append_flag=False)
+                elif button == 'Refresh':                 # Search for Scanners Again, Ignoring the Cache
+                    if discovery['thread'] is not None:
+                        continue    # Still Searching
+                    window.FindElement('scanner').Update(disabled=True)
+                    window.FindElement('Refresh').Update(disabled=True)
+                    UpdateOutput(window, 'Searching for Scanners...\n')
+                    discovery = StartDiscovery(refresh=True, search=True)
                 elif button == 'Scan':
-                    # Generate a Unique Filename Based on Date and Time
-                    outfile = os.path.join(
-                        outputdir, 'scan_' + datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + '.pdf')
-                    # Scan and Optionally OCR the Document
-                    ScanDocument(window, outfile, values)
-                    # View the Output File
-                    if values['view']:
-                        ViewDocument(window, outfile)
+                    # A Scan Needs the Backend - One Asked for During a Search Waits for It to Finish,
+                    #    Without Holding Up the Window
+                    if discovery['thread'] is not None:
+                        UpdateOutput(window, 'Scan Will Start When the Search for Scanners Finishes...\n')
+                        waiting.append(dict(values))
+                    else:
+                        QueueScan(window, outputdir, jobs, dict(values))
             window.CloseNonBlockingForm()
+            # Scans Under Way When the Window Closes Still Save Their Documents
+            WaitForJobs(jobs)
+            StopScheduler()
+            CloseScanners()
+
+    def QueueScan(window, outputdir, jobs, values):
+        # Scan, Optionally OCR, and View a Document as a Scheduler Job - The Window Stays Usable, so More
+        #    Documents Can Be Queued Meanwhile - Each is Scanned Once the Scans Before It Finish, While
+        #    the Documents Before It are OCR'd
+        # Generate a Unique Filename Based on Date and Time - Jobs Started the Same Second are Told
+        #    Apart by Job Number
+        outfile = OutputFileName(outputdir)
+        if any(job['outfile'] == outfile for job in jobs):
+            outfile = OutputFileName(outputdir, '-job' + str(len(jobs) + 1))
+        busy = any(job['state'] in ('queued', 'scanning') for job in jobs)
+        StartScheduler()
+        jobs.append(SubmitJob(values, outfile, window))
+        if busy:
+            UpdateOutput(window, '[Job ' + str(jobs[-1]['id']) + '] Waiting for the Scan Under Way...\n')
+
+    def RenderOutput(window):
+        # Draw Everything Queued for the Window Since the Last Frame - Runs in the Window Thread
+        #    Consecutive Status Lines are Joined and Drawn with One Update
+        pending = {}    # Output Element Key --> (Append, [Text])
+        popups = []
+        while True:
+            try:
+                event = uievents.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'output':
+                (_, key, text, append) = event
+                if not append:
+                    pending[key] = (False, [])    # Cleared - Lines Queued Before are Never Seen
+                pending.setdefault(key, (True, []))[1].append(text)
+            elif event[0] == 'popup':
+                popups.append(event[1:])
+        try:
+            for key, (append, texts) in pending.items():
+                window.FindElement(key).Update(disabled=False)
+                window.FindElement(key).Update(value=CleanCommandOutput(''.join(texts)), append=append)
+                window.FindElement(key).Update(disabled=True)
+            for (title, text) in popups:
+                sg.Popup(title, text)
+        except Exception as e:
+            sg.Popup('RenderOutput', 'Error: ' + str(e))
+
+    def StartDiscovery(refresh=False, search=True):
+        # Search for Scanners in a Background Thread so the Window is Usable Meanwhile
+        #    The Imaging and OCR Modules are Imported Afterwards, so the First Scan Does Not Wait for Them
+        #    Only the Window Thread Touches the Window - FinishDiscovery() Lists What Was Found
+        discovery = {'thread': None, 'search': search, 'scanners': [], 'error': None}
+
+        def Discover():
+            try:
+                if search:
+                    discovery['scanners'] = FindScanners(refresh=refresh)
+                    StartupMark('scanners')
+                ImportModules(ocr=True)
+                StartupMark('modules')
+            except Exception as e:
+                discovery['error'] = str(e)
+
+        discovery['thread'] = threading.Thread(target=Discover, name='discovery', daemon=True)
+        discovery['thread'].start()
+        return(discovery)
+
+    def FinishDiscovery(window, discovery, keys):
+        # List the Scanners Found by a Background Search and Report Startup Timing After the First One
+        discovery['thread'] = None
+        if discovery['error'] is not None:
+            UpdateOutput(window, 'Unable to Load Modules: ' + discovery['error'] + '\n')
+        if discovery['search']:
+            ListScanners(window, discovery['scanners'], keys)
+        ReportStartup(window)
+
+    def ListScanners(window, scanners, keys):
+        # Add the List of Scanners to the Input Combo
+        if len(scanners) == 0:
+            # Scan Stays Disabled - There is Nothing to Scan On
+            window.FindElement('scanner').Update(values=['Unable to Locate a Scanner'], disabled=False)
+            window.FindElement('Refresh').Update(disabled=False)
+            window.FindElement('Scan').Update(disabled=True)
+        else:
+            window.FindElement('scanner').Update(values=scanners, disabled=False)
+            # Enable All Input Fields
+            for key in keys:
+                window.FindElement(key).Update(disabled=False)
+        window.Refresh()
+
+    def SelectBackend(spec):
+        # Return the Scanner Backend Named by the Specification - pyinsane2 or a Simulated Scanner
+        #    Backends Provide the pyinsane2 Calls Used Here: init, get_devices, set_scanner_opt,
+        #    maximize_scan_area and exit, with Devices Returning a Session from scan(multiple) Whose
+        #    scan.read() Raises EOFError at the End of Each Page and scan.get_image() Returns That Page
+        (name, _, params) = spec.partition(':')
+        if name == 'pyinsane2':
+            # Loaded When First Used - the SANE/WIA Bindings Slow Startup Otherwise
+            return(LazyImport('pyinsane2'))
+        if name != 'virtual':
+            raise ValueError('Unknown Scanner Backend: ' + name)
+        settings = {'pages': None, 'size': '8.5x11', 'dpi': None, 'mode': None, 'ppm': '0', 'images': None,
+                    'blank': '0', 'devices': '1', 'jam': '0'}
+        for param in params.split(','):
+            if param:
+                (key, _, value) = param.partition('=')
+                if key not in settings:
+                    raise ValueError('Unknown Virtual Scanner Setting: ' + key)
+                settings[key] = value
+        try:
+            (width, height) = [float(x) for x in settings['size'].lower().split('x')]
+            virtual = {
+                'pages': int(settings['pages'] or 10),
+                'size': (width, height),          # Page Size in Inches
+                'dpi': int(settings['dpi']) if settings['dpi'] else None,
+                'mode': settings['mode'],
+                'ppm': float(settings['ppm']),    # Feed Rate in Pages per Minute, 0 for Unlimited
+                'images': None,
+                'blank': int(settings['blank']),  # Every Nth Page is Blank, e.g., 2 for Duplex Backs
+                'devices': max(1, int(settings['devices'])),
+                'jam': int(settings['jam']),      # The Feed Jams at Page N, for Testing Failure Handling
+            }
+        except ValueError:
+            raise ValueError('Invalid Virtual Scanner Specification: ' + spec)
+        if virtual['mode'] is not None and virtual['mode'] not in ('Color', 'Gray', 'Lineart'):
+            raise ValueError('Invalid Virtual Scanner Mode: ' + virtual['mode'])
+        if settings['images']:
+            # Emit Image Files from a Directory Instead of Synthetic Pages, Repeating as Needed
+            virtual['images'] = sorted(os.path.join(settings['images'], f) for f in os.listdir(settings['images'])
+                                       if f.lower().endswith(('.tif', '.tiff', '.png', '.jpg', '.jpeg', '.bmp')))
+            if len(virtual['images']) == 0:
+                raise ValueError('No Image Files Found in: ' + settings['images'])
+            if settings['pages'] is None:
+                virtual['pages'] = len(virtual['images'])
+
+        return(VirtualBackend(virtual))
+
+    def VirtualBackend(virtual):
+        # Simulated Scanner(s) for Benchmarking and Testing Without Hardware
+        #    Fixed 'dpi' or 'mode' Settings Reject Other Values, Like a Device with Limited Capabilities
+
+        def VirtualDevice(number):
+            if virtual['devices'] == 1:
+                nice_name = 'Virtual Scanner (Simulated)'
+            else:
+                nice_name = 'Virtual Scanner ' + str(number+1) + ' (Simulated)'
+            device = types.SimpleNamespace(
+                name='virtual:' + str(number), nice_name=nice_name, dev_type='virtual all-in-one',
+                options={'source': types.SimpleNamespace(value='Flatbed'),
+                         'resolution': types.SimpleNamespace(value=virtual['dpi'] or 300),
+                         'mode': types.SimpleNamespace(value=virtual['mode'] or 'Gray'),
+                         'size': types.SimpleNamespace(value=virtual['size'])})
+            device.scan = lambda multiple=False: Scan(device, multiple)
+            return(device)
+
+        def SetScannerOpt(scanner, opt, values):
+            accepted = {
+                'source': ['Flatbed', 'FlatBed', 'ADF', 'Feeder', 'Auto'],
+                'resolution': [virtual['dpi']] if virtual['dpi'] else [75, 100, 150, 200, 300, 600, 1200],
+                'mode': [virtual['mode']] if virtual['mode'] else ['Color', 'Gray', 'Lineart'],
+            }
+            if opt not in accepted:
+                raise KeyError('Option Not Supported: ' + opt)
+            for value in values:
+                if value in accepted[opt]:
+                    scanner.options[opt].value = value
+                    return
+            raise ValueError('Value(s) Not Accepted for ' + opt + ': ' + str(values))
+
+        def MaximizeScanArea(scanner):
+            # Simulated Scanner Bed is Legal Width by A4 Height
+            scanner.options['size'].value = (max(virtual['size'][0], 8.5), max(virtual['size'][1], 11.7))
+
+        def Scan(device, multiple=False):
+            feeder = device.options['source'].value in ('ADF', 'Feeder')
+            total = virtual['pages'] if (feeder and multiple) else min(1, virtual['pages'])
+            if total <= 0:
+                raise ValueError('Document Feeder is Empty')
+            session = types.SimpleNamespace(scan=None)
+            state = {'page': 0, 'next': time.time(), 'image': None}
+
+            def Read():
+                # Deliver a Whole Page per Read, Paced to the Feed Rate
+                if state['page'] >= total:
+                    raise StopIteration
+                if state['page'] + 1 == virtual['jam']:
+                    raise OSError('Simulated Paper Jam')
+                if virtual['ppm'] > 0:
+                    state['next'] += 60.0 / virtual['ppm']
+                    sleep(max(0, state['next'] - time.time()))
+                state['image'] = VirtualPage(virtual, device.options, state['page'])
+                state['page'] += 1
+                raise EOFError
+
+            def GetImage():
+                # Only the Last Page is Kept, Like a Device Streaming Its Feed
+                return(state['image'])
+
+            session.scan = types.SimpleNamespace(read=Read, get_image=GetImage)
+            return(session)
+
+        devices = [VirtualDevice(number) for number in range(virtual['devices'])]
+        return(types.SimpleNamespace(
+            init=lambda: None, exit=lambda: None, get_devices=lambda: list(devices),
+            set_scanner_opt=SetScannerOpt, maximize_scan_area=MaximizeScanArea,
+            concurrent=True))    # Simulated Devices Share Nothing, so They Can Scan at the Same Time
+
+    def VirtualPage(virtual, settings, number):
+        # Create One Simulated Page at the Device's Current Size, Resolution and Mode
+        dpi = settings['resolution'].value
+        size = (int(settings['size'].value[0] * dpi), int(settings['size'].value[1] * dpi))
+        pilmode = {'Color': 'RGB', 'Gray': 'L', 'Lineart': '1'}[settings['mode'].value]
+        if virtual['blank'] > 0 and (number + 1) % virtual['blank'] == 0:
+            image = PIL.Image.new('RGB' if pilmode == 'RGB' else 'L', size, 'white')
+        elif virtual['images'] is not None:
+            with PIL.Image.open(virtual['images'][number % len(virtual['images'])]) as source:
+                image = source.convert(pilmode if pilmode != '1' else 'L').resize(size)
+        else:
+            # Lines of Printed Text on White Paper, with a Colored Heading in Color Mode
+            image = PIL.Image.new('RGB' if pilmode == 'RGB' else 'L', size, 'white')
+            draw = PIL.ImageDraw.Draw(image)
+            try:
+                font = PIL.ImageFont.load_default(size=dpi // 6)    # 12 Point Text
+            except TypeError:
+                font = PIL.ImageFont.load_default()
+            if pilmode == 'RGB':
+                draw.rectangle((dpi, dpi // 2, size[0] - dpi, dpi), fill=(40, 90, 160))
+            words = ('the quick brown fox jumps over the lazy dog while scanning page ' + str(number + 1)).split()
+            y = dpi + dpi // 4
+            line = 0
+            while y < size[1] - dpi:
+                text = ' '.join(words[(line + i) % len(words)] for i in range(12))
+                draw.text((dpi, y), text.capitalize() + '.', fill='black', font=font)
+                y += dpi // 4
+                line += 1
+        if pilmode == '1':
+            image = image.convert('1')
+        image.info['dpi'] = (dpi, dpi)
+        return(image)
+
+    def Headless():
+        # Scan a Single Document Using Command-line Options, Reporting Progress as Log Lines
+        if cmdargs.list_scanners:
+            scanners = [] if cmdargs.refresh_scanners else FindScanners(cached=True)
+            if len(scanners) == 0:
+                scanners = FindScanners(refresh=cmdargs.refresh_scanners)
+            CloseScanners()
+            for scanner in scanners:
+                LogEvent('scanner', name=scanner)
+            return(0 if len(scanners) > 0 else 1)
+
+        # Import the Modules Scanning Needs Now, so Startup is Reported in Full
+        ImportModules(cmdargs.ocr)
+        StartupMark('modules')
+        ReportStartup(None)
+        if len(cmdargs.job) > 0:
+            return(Jobs())
+        if cmdargs.ingest is not None:
+            return(Ingest())
+
+        outfile = ScanOutputFile(cmdargs.output)
+        values = ScanValues(cmdargs.scanner, cmdargs.source, cmdargs.ocr, cmdargs.color, cmdargs.paper)
+
+        started = time.time()
+        LogEvent('start', scanner=values['scanner'], source=cmdargs.source, ocr=values['ocr'],
+                 color=values['color'], paper=cmdargs.paper, output=outfile)
+        if cmdargs.refresh_scanners:
+            FindScanners(refresh=True)
+        result = ScanDocument(None, outfile, values)
+        CloseScanners()
+        if result and len(failures) == 0:
+            LogEvent('done', output=outfile, seconds=round(time.time() - started, 3))
+            return 0
+        LogEvent('failed', output=outfile, seconds=round(time.time() - started, 3))
+        return 1
+
+    def ScanOutputFile(output, suffix=''):
+        # Output to the Given File, a Unique File in the Given Directory or the PDF Folder in the Home Directory
+        #    A Suffix Tells Apart the Documents of Several Jobs Given the Same Output
+        if output is None or os.path.isdir(output) or output.endswith(os.sep):
+            outputdir = output or os.path.join(os.path.expanduser('~'), 'PDF')
+            if os.path.exists(outputdir) == False:
+                os.makedirs(outputdir)
+            return(os.path.abspath(OutputFileName(outputdir, suffix)))
+        (root, extension) = os.path.splitext(output)
+        return(os.path.abspath(root + suffix + (extension or '.pdf')))
+
+    def ScanValues(scanner, source, ocr, color, paper):
+        # Scan Settings in the Form Returned by the Launcher Window
+        values = {
+            'scanner': scanner,
+            'glass': source == 'glass',
+            'adf': source == 'adf',
+            'ocr': ocr,
+            'view': False,
+            'letter': paper == 'letter',
+            'color': color,
+        }
+        if values['ocr'] and os.name == 'nt' and ((len(tesseract) == 0) or (len(PDFTK_PATH) == 0 and pypdf is None)):
+            LogEvent('warning', message="Unable to Locate 'tesseract-ocr/pdftk' --> OCR is Disabled")
+            values['ocr'] = False
+        return(values)
+
+    def Jobs():
+        # Scan Several Documents from --job Specifications, Reporting Progress as Log Lines Tagged by Job
+        #    Each Document is Scanned While the Ones Before It are OCR'd and Merged
+        specs = []
+        for spec in cmdargs.job:
+            try:
+                specs.append(ParseJob(spec))
+            except ValueError as e:
+                parser.error(str(e))
+        started = time.time()
+        if cmdargs.refresh_scanners:
+            FindScanners(refresh=True)
+        StartScheduler()
+        jobs = []
+        for (number, settings) in enumerate(specs):
+            suffix = '-job' + str(number+1) if len(specs) > 1 and settings['output'] is None else ''
+            outfile = ScanOutputFile(settings['output'] or cmdargs.output, suffix)
+            values = ScanValues(settings['scanner'], settings['source'], settings['ocr'], settings['color'],
+                                settings['paper'])
+            jobs.append(SubmitJob(values, outfile))
+        WaitForJobs(jobs)
+        StopScheduler()
+        CloseScanners()
+        failed = [job['id'] for job in jobs if job['state'] != 'done']
+        LogEvent('done' if len(failed) == 0 else 'failed', jobs=len(jobs), failed=failed,
+                 seconds=round(time.time() - started, 3))
+        return(0 if len(failed) == 0 else 1)
+
+    def ParseJob(spec):
+        # Settings for One Job from 'key=value,...', Defaulting to the Command-line Options
+        #    A Setting Without '=' is the Scanner Name
+        settings = {'scanner': cmdargs.scanner, 'source': cmdargs.source, 'ocr': cmdargs.ocr,
+                    'color': cmdargs.color, 'paper': cmdargs.paper, 'output': None}
+        choices = {'source': ('glass', 'adf'), 'paper': ('letter', 'max')}
+        for param in spec.split(','):
+            if not param.strip():
+                continue
+            (key, sep, value) = param.partition('=')
+            (key, value) = (key.strip().lower(), value.strip()) if sep else ('scanner', key.strip())
+            if key not in settings:
+                raise ValueError('Unknown Job Setting: ' + key + ' in: ' + spec)
+            if key in ('ocr', 'color'):
+                if value.lower() not in ('yes', 'no', 'true', 'false', 'on', 'off', '1', '0'):
+                    raise ValueError('Invalid Job Setting: ' + param + ' in: ' + spec)
+                value = value.lower() in ('yes', 'true', 'on', '1')
+            elif key in choices and value not in choices[key]:
+                raise ValueError('Invalid Job Setting: ' + param + ' in: ' + spec)
+            settings[key] = value
+        return(settings)
+
+    def StartScheduler():
+        # Start the Worker Pool Shared by Every Job - OCR from All Scanners Competes for the Same Cores
+        with scheduler['lock']:
+            if scheduler['pool'] is None:
+                scheduler['pool'] = concurrent.futures.ThreadPoolExecutor(max_workers=options['ocr_workers'])
+
+    def StopScheduler():
+        # Shut Down the Shared Worker Pool Once Every Job Has Finished
+        with scheduler['lock']:
+            pool = scheduler['pool']
+            scheduler['pool'] = None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def SubmitJob(values, outfile, window=None):
+        # Queue a Scan Job and Start Its Thread - Jobs Take Turns at the Scanner Backend, Each Scanning
+        #    While the Jobs Before It are OCR'd and Merged
+        #    A Job Started from the Window Reports to It, and Opens Its Document If Asked To
+        job = NewJob(values, outfile)
+        job['window'] = window
+        job['thread'] = threading.Thread(target=RunJob, args=(job,), daemon=True)
+        job['thread'].start()
+        return(job)
+
+    def NewJob(values, outfile):
+        # Add a Job to the Scheduler's List
+        with scheduler['lock']:
+            job = {
+                'id': len(scheduler['jobs']) + 1,
+                'values': values,
+                'outfile': outfile,
+                'state': 'queued',       # queued --> scanning --> processing --> done or failed
+                'scanner': None,         # Name of the Device the Job Scans On
+                'status': '',            # Last Status Line
+                'errors': [],
+                'timings': {},
+                'submitted': time.time(),
+                'finished': None,
+                'devicelock': None,      # Held While the Job Has the Scanner Backend, or Its Device
+                'window': None,          # Launcher Window the Job Reports to, None When Headless
+            }
+            scheduler['jobs'].append(job)
+        return(job)
+
+    def RunJob(job):
+        # Scan and Process One Job - Runs in the Job's Own Thread
+        #    Only Acquisition Holds the Scanner - OCR and Merge Finish While the Next Job Scans
+        #    pyinsane2 Talks to Every Device Through One Unlocked Daemon Connection and Closes the Open
+        #    Device When Another is Opened, so Each Job Holds the Device Lock from Opening Its Scanner
+        #    to the End of Acquisition - This Also Keeps Discovery Out Mid-Feed
+        #    Only a Backend Declaring Itself 'concurrent', Like the Virtual One, Scans on Several Devices at Once
+        jobcontext.job = job
+        try:
+            if options['headless']:
+                LogEvent('job', state=job['state'], scanner=job['values']['scanner'], output=job['outfile'])
+            with devicelock:
+                parallel = getattr(backend, 'concurrent', False)
+            if not parallel:
+                devicelock.acquire()
+                job['devicelock'] = devicelock
+            (device, nice_name) = OpenScanner(job['values']['scanner'])
+            if device is None:
+                ShowError('RunJob', 'Unable to Locate Scanner: ' + str(job['values']['scanner']))
+                SetJobState('failed')
+                return
+            job['scanner'] = nice_name
+            if parallel:
+                with scheduler['lock']:
+                    scannerlock = scheduler['devices'].setdefault(nice_name, threading.Lock())
+                scannerlock.acquire()
+                job['devicelock'] = scannerlock
+            SetJobState('scanning')
+            result = ScanDocument(job['window'], job['outfile'], dict(job['values'], scanner=nice_name),
+                                  job['timings'])
+            SetJobState('done' if result and len(job['errors']) == 0 else 'failed')
+            # View the Output File
+            if job['state'] == 'done' and job['values'].get('view'):
+                ViewDocument(job['window'], job['outfile'])
+        except Exception as e:
+            ShowError('RunJob', 'Error: ' + str(e))
+            SetJobState('failed')
+        finally:
+            ReleaseJobScanner(job)
+            jobcontext.job = None
+
+    def SetJobState(state):
+        # Record the Progress of the Job Run by the Current Thread - Does Nothing Outside a Job
+        #    The Scanner is Handed to the Next Job as Soon as Acquisition Ends
+        job = getattr(jobcontext, 'job', None)
+        if job is None:
+            return
+        job['state'] = state
+        if state != 'scanning':
+            ReleaseJobScanner(job)
+        if state in ('done', 'failed'):
+            job['finished'] = time.time()
+        if options['headless']:
+            LogEvent('job', state=state, scanner=job['scanner'], output=job['outfile'])
+
+    def ReleaseJobScanner(job):
+        # Let the Next Job Waiting for This Job's Scanner Start
+        #    Called Only from the Job's Own Thread, Which Holds the Lock
+        with scheduler['lock']:
+            scannerlock = job['devicelock']
+            job['devicelock'] = None
+        if scannerlock is not None:
+            scannerlock.release()
+
+    def Ingest():
+        # OCR and Merge Existing Image Files into PDF Documents, Several Documents at a Time
+        #    Documents Whose Output is Newer than All of Their Images are Skipped, so an
+        #    Interrupted Run Picks Up Where It Left Off
+        started = time.time()
+        try:
+            documents = IngestDocuments(cmdargs.ingest, cmdargs.group_pattern)
+        except (OSError, ValueError, re.error) as e:
+            parser.error(str(e))
+        outputdir = cmdargs.output or os.path.join(os.path.expanduser('~'), 'PDF')
+        values = ScanValues('', 'glass', cmdargs.ocr, False, 'max')
+        values['ingest'] = True
+        LogEvent('start', source=cmdargs.ingest, documents=len(documents), ocr=values['ocr'], output=outputdir)
+        StartScheduler()
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, cmdargs.ingest_workers))
+        jobs = []
+        skipped = 0
+        for (name, files) in documents:
+            outfile = os.path.abspath(os.path.join(outputdir, name + '.pdf'))
+            if not cmdargs.force and UpToDate(outfile, files):
+                LogEvent('skipped', output=outfile, pages=len(files))
+                skipped += 1
+                continue
+            job = NewJob(values, outfile)
+            job['files'] = files
+            jobs.append(job)
+            pool.submit(RunIngestJob, job)
+        pool.shutdown(wait=True)
+        StopScheduler()
+        failed = [job['outfile'] for job in jobs if job['state'] != 'done']
+        LogEvent('done' if len(failed) == 0 else 'failed', documents=len(documents), processed=len(jobs),
+                 skipped=skipped, failed=failed, seconds=round(time.time() - started, 3))
+        return(0 if len(failed) == 0 else 1)
+
+    def IngestDocuments(source, pattern):
+        # Group Image Files into Documents - Returns (Document Name, [Image Files]) in Name Order
+        #    A Directory Tree Gives One Document per Folder, or per Name Matched by the Pattern Within a Folder;
+        #    a Manifest Lists One Image per Line, Optionally Followed by a Tab and the Name of Its Document
+        regex = re.compile(pattern) if pattern else None
+        entries = []    # (Folder Name, Image File, Document Name or None)
+        if os.path.isdir(source):
+            rootname = os.path.basename(os.path.abspath(source))
+            for (dirpath, dirnames, filenames) in os.walk(source):
+                dirnames.sort()
+                folder = os.path.relpath(dirpath, source)
+                for filename in sorted(filenames, key=NaturalKey):
+                    if filename.lower().endswith(('.tif', '.tiff', '.png', '.jpg', '.jpeg')):
+                        entries.append((folder, os.path.join(dirpath, filename), None))
+        else:
+            basedir = os.path.dirname(os.path.abspath(source))
+            rootname = os.path.splitext(os.path.basename(source))[0]
+            with open(source) as f:
+                for line in f:
+                    if not line.strip() or line.lstrip().startswith('#'):
+                        continue
+                    (filename, _, name) = line.rstrip('\r\n').partition('\t')
+                    filename = os.path.join(basedir, filename.strip())
+                    # Folders are Named by Their Path from the Manifest, so 2019/jan and 2020/jan Stay Apart -
+                    #    Folders Outside Its Directory Lose the Leading '..' Parts
+                    folder = os.path.relpath(os.path.dirname(os.path.abspath(filename)), basedir)
+                    folder = os.path.join(*[part for part in folder.split(os.sep) if part != os.pardir] or ['.'])
+                    entries.append((folder, filename, name.strip() or None))
+        documents = {}
+        for (folder, filename, name) in entries:
+            if name is None and regex is not None:
+                match = regex.search(os.path.basename(filename))
+                if match is None:
+                    LogEvent('skipped', file=filename, message='File Name Does Not Match the Group Pattern')
+                    continue
+                name = os.path.join(folder, match.group(1) if regex.groups else match.group(0))
+            elif name is None:
+                name = rootname if folder == '.' and rootname else folder
+            documents.setdefault(os.path.normpath(name), []).append(filename)
+        if len(documents) == 0:
+            raise ValueError('No Image Files Found in: ' + source)
+        return(sorted(documents.items()))
+
+    def NaturalKey(name):
+        # Sort Key Putting page2 Before page10
+        return([int(part) if part.isdigit() else part.lower() for part in re.split(r'([0-9]+)', name)])
+
+    def UpToDate(outfile, files):
+        # True If the Output File Exists and is Newer than Every Image File
+        try:
+            return(os.path.getmtime(outfile) >= max(os.path.getmtime(filename) for filename in files))
+        except OSError:
+            return(False)
+
+    def RunIngestJob(job):
+        # OCR and Merge One Document's Images - Runs in an Ingest Worker Thread
+        jobcontext.job = job
+        try:
+            SetJobState('processing')
+            result = IngestDocument(job)
+            SetJobState('done' if result and len(job['errors']) == 0 else 'failed')
+        except Exception as e:
+            ShowError('RunIngestJob', 'Error: ' + str(e))
+            SetJobState('failed')
+        finally:
+            jobcontext.job = None
+
+    def IngestDocument(job):
+        # Feed a Document's Image Files Through the Pipeline in Place of Scanned Pages - Returns True on Success
+        funcname = 'IngestDocument'
+        if not os.path.isdir(os.path.dirname(job['outfile'])):
+            os.makedirs(os.path.dirname(job['outfile']), exist_ok=True)
+        workdir = CreateWorkingDirectory()
+        pipeline = StartPipeline(workdir, job['values'], job['outfile'], job['timings'])
+        images = []
+        for filename in job['files']:
+            try:
+                for image in ReadImages(filename):
+                    images.append(image)
+                    image = None
+                    FeedPipeline(None, pipeline, images)
+            except (OSError, ValueError, EOFError) as e:
+                FailPipeline(pipeline, 'Unable to Read Image File: ' + filename + '\n' + str(e))
+            if pipeline['abort'].is_set():
+                break
+        UpdateOutput(None, 'Total Pages: ' + str(len(images)) + '\n')
+        return(FinishDocument(None, funcname, pipeline, len(images)))
+
+    def ReadImages(filename):
+        # Pages of an Image File Ready for the Pipeline - Multi-Page TIFF Files Give One Image per Page
+        with PIL.Image.open(filename) as source:
+            for frame in PIL.ImageSequence.Iterator(source):
+                dpi = frame.info.get('dpi') or source.info.get('dpi')
+                if frame.mode in ('1', 'L', 'RGB'):
+                    image = frame.copy()
+                else:
+                    image = frame.convert('L' if frame.mode in ('LA', 'I', 'I;16', 'F') else 'RGB')
+                # Files Without a Believable Resolution are Taken to Be 300 dpi Scans
+                if dpi and min(dpi) >= 50:
+                    image.info['dpi'] = (int(round(dpi[0])), int(round(dpi[1])))
+                else:
+                    image.info['dpi'] = (300, 300)
+                yield(image)
+
+    def WaitForJobs(jobs):
+        # Wait for Jobs to Finish
+        for job in jobs:
+            while job['thread'].is_alive():
+                job['thread'].join(0.5)
+
+    def Benchmark():
+        # Run the Pipeline Over a Fixed Set of Simulated 300 dpi Pages in Gray and Color, With and Without OCR
+        #    Reports Per-Stage Wall and CPU Time, Peak Memory and Pages per Minute for Each Scenario
+        options['log_status'] = False
+        options['ocr_cache_mb'] = 0    # Synthetic Pages Repeat from Run to Run - Always Time Real OCR
+        ImportModules(ocr=True)    # Before the First Scenario, so It is Not Charged with the Imports
+        pagecount = max(1, cmdargs.benchmark_pages)
+        results = {
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': sys.platform,
+            'cpus': os.cpu_count(),
+            'options': {key: options[key] for key in ('ocr_workers', 'queue_depth', 'in_memory', 'spill_mb',
+                                                      'release_pages')},
+            'pages': pagecount,
+            'corpus': cmdargs.benchmark_images or 'synthetic',
+            'scenarios': {},
+        }
+        for mode in ('Gray', 'Color'):
+            for ocr in (False, True):
+                name = mode.lower() + ('-ocr' if ocr else '')
+                if ocr and not OCRAvailable():
+                    LogEvent('warning', scenario=name, message='tesseract Not Available - Skipping OCR Scenario')
+                    continue
+                spec = 'virtual:pages=' + str(pagecount) + ',dpi=300,mode=' + mode
+                if cmdargs.benchmark_images:
+                    spec += ',images=' + cmdargs.benchmark_images
+                UseBackend(spec)
+                values = {'scanner': '', 'glass': False, 'adf': True, 'ocr': ocr,
+                          'view': False, 'letter': True, 'color': mode == 'Color'}
+                workdir = tempfile.mkdtemp()
+                outfile = os.path.join(workdir, name + '.pdf')
+                timings = {}
+                errors = len(failures)
+                PeakMemory(reset=True)
+                wall = time.perf_counter()
+                cpu = time.process_time()
+                ok = ScanDocument(None, outfile, values, timings)
+                wall = time.perf_counter() - wall
+                cpu = time.process_time() - cpu
+                result = {
+                    'ok': bool(ok) and len(failures) == errors,
+                    'wall': round(wall, 3),
+                    'cpu': round(cpu, 3),
+                    'peak_rss_mb': PeakMemory(),
+                    'pages_per_minute': round(pagecount * 60.0 / wall, 2) if wall > 0 else None,
+                    'output_bytes': os.path.getsize(outfile) if os.path.isfile(outfile) else None,
+                    'stages': {stage: {key: round(value, 4) for key, value in totals.items()}
+                               for stage, totals in sorted(timings.items())},
+                }
+                shutil.rmtree(workdir, ignore_errors=True)
+                results['scenarios'][name] = result
+                LogEvent('benchmark', scenario=name, **result)
+
+        CloseScanners()
+
+        # Save the Results for Comparison with Later Runs
+        resultfile = cmdargs.benchmark_output or (
+            'scan2pdf-benchmark-' + datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + '.json')
+        with open(resultfile, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        LogEvent('saved', output=os.path.abspath(resultfile))
+
+        status = 0 if all(result['ok'] for result in results['scenarios'].values()) else 1
+        if cmdargs.benchmark_compare:
+            with open(cmdargs.benchmark_compare) as f:
+                baseline = json.load(f)
+            if CompareBenchmarks(baseline, results, cmdargs.benchmark_tolerance) > 0:
+                status = 1
+
+        return(status)
+
+    def CompareBenchmarks(baseline, results, tolerance):
+        # Report Throughput and Per-Page Stage Time Changes Against Earlier Results - Returns the Number of Regressions
+        regressions = 0
+        for name, result in sorted(results['scenarios'].items()):
+            before = baseline.get('scenarios', {}).get(name)
+            if before is None or not before.get('ok') or not result['ok']:
+                continue
+            # Compare Stage Times Per Page so Runs with Different Page Counts are Comparable
+            checks = [('pages_per_minute', before['pages_per_minute'], result['pages_per_minute'], False)]
+            for stage, totals in sorted(result['stages'].items()):
+                if stage in before['stages']:
+                    checks.append((stage + '_wall_per_page', before['stages'][stage]['wall'] / baseline['pages'],
+                                   totals['wall'] / results['pages'], True))
+            for (metric, old, new, lower_is_better) in checks:
+                if not old:
+                    continue
+                change = (new - old) * 100.0 / old
+                regressed = (change > tolerance) if lower_is_better else (change < -tolerance)
+                # Ignore Stages Too Short to Time Reliably (Under 5 ms per Page)
+                if lower_is_better and abs(new - old) < 0.005:
+                    regressed = False
+                regressions += regressed
+                LogEvent('compare', scenario=name, metric=metric, baseline=round(old, 4),
+                         current=round(new, 4), change_percent=round(change, 1), regression=regressed)
+
+        return(regressions)
+
+    def PeakMemory(reset=False):
+        # Peak Resident Memory of This Process in Megabytes, or None If Unavailable
+        #    Linux Can Reset the Peak so Each Benchmark Scenario is Measured Separately
+        try:
+            if reset:
+                with open('/proc/self/clear_refs', 'w') as f:
+                    f.write('5')
+                return None
+            with open('/proc/self/status') as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        return(round(int(line.split()[1]) / 1024.0, 1))
+        except OSError:
+            pass
+        if reset:
+            return None
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return(round(peak / (1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0), 1))
+        except ImportError:
+            return None
+
+    def OCRAvailable():
+        # Check Whether tesseract Can Be Used on This System
+        if os.name == 'nt':
+            return(len(tesseract) > 0)
+        try:
+            return(pyocr.libtesseract.is_available())
+        except Exception:
+            return False
+
+    def LogEvent(event, **fields):
+        # Write a Headless Progress Record to Standard Output as a JSON Line or Plain Text
+        record = {'time': datetime.datetime.now().isoformat(timespec='milliseconds'), 'event': event}
+        job = getattr(jobcontext, 'job', None)
+        if job is not None:
+            record['job'] = job['id']
+        record.update(fields)
+        if options['log_format'] == 'json':
+            line = json.dumps(record)
+        else:
+            line = record['time'] + ' ' + ('[job ' + str(job['id']) + '] ' if job is not None else '') + event + ': ' + \
+                ' '.join(str(key) + '=' + str(value) for key, value in fields.items())
+        with loglock:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+
+    def FindScanners(refresh=False, cached=False):
+        # Get a List of Available Scanners
+        #    With 'cached' the Names Saved by an Earlier Run are Returned, If Still Fresh, Without Any Discovery
+        scanners = []
+        if cached:
+            with devicelock:
+                entries = LoadDeviceCache()['devices']
+            return([entry['nice_name'] for entry in entries if IsScanner(entry['dev_type'])])
+        try:
+            devices = ScannerDevices(refresh)
+            for i in range(0, len(devices)):
+                if IsScanner(devices[i].dev_type):
+                    scanners.append(devices[i].nice_name)
+        except:
+            pass
+
+        return(scanners)
+
+    def IsScanner(dev_type):
+        # Scanners and All-in-One Printers Can Scan Documents
+        return(dev_type.find('scanner') > -1 or dev_type.find('all-in-one') > -1)
+
+    def ScannerDevices(refresh=False):
+        # Return the Devices Found by the Backend, Discovering Them Only When the Cache is Empty, Expired or Refreshed
+        #    The Backend Stays Initialized so Consecutive Scans Reuse the Same Device Session
+        with devicelock:
+            if not devicecache['initialized']:
+                backend.init()
+                devicecache['initialized'] = True
+            if refresh or devicecache['devices'] is None or \
+                    time.time() - devicecache['time'] > options['device_ttl']:
+                devicecache['devices'] = list(backend.get_devices())
+                devicecache['time'] = time.time()
+                # Save the Device List so the Next Run Can Show It Without Waiting for Discovery
+                cache = LoadDeviceCache()
+                cache['time'] = devicecache['time']
+                cache['devices'] = [{'name': str(getattr(device, 'name', device.nice_name)),
+                                     'nice_name': device.nice_name, 'dev_type': device.dev_type}
+                                    for device in devicecache['devices']]
+                if refresh:
+                    cache['options'] = {}    # Explicit Refresh Also Forgets Accepted Options
+                SaveDeviceCache(cache)
+            return(devicecache['devices'])
+
+    def OpenScanner(scanner):
+        # Return the First Scanner Whose Name Contains 'scanner' and Its Name, or (None, None)
+        #    Other Devices the Backend Finds, Such as Cameras, are Never Chosen
+        #    A Device Saved by an Earlier Run is Opened Directly by Name When the Backend Supports It
+        with devicelock:
+            devices = devicecache['devices']
+            entries = LoadDeviceCache()['devices'] if devices is None else []
+            byname = hasattr(backend, 'Scanner')    # The First Use of a Lazily Imported Backend is Under the Lock
+        if devices is None and byname:
+            for entry in entries:
+                if entry['nice_name'].find(scanner) > -1 and IsScanner(entry['dev_type']):
+                    try:
+                        with devicelock:
+                            if not devicecache['initialized']:
+                                backend.init()
+                                devicecache['initialized'] = True
+                        return((backend.Scanner(name=entry['name']), entry['nice_name']))
+                    except Exception:
+                        break
+        for device in ScannerDevices():
+            if device.nice_name.find(scanner) > -1 and IsScanner(device.dev_type):
+                return((device, device.nice_name))
+        return((None, None))
+
+    def ForgetDevices(nice_name=None):
+        # Drop Cached Device Objects After a Failure so the Next Scan Discovers Devices Again
+        #    The Option Values the Failed Device Accepted are Forgotten Too
+        with devicelock:
+            devicecache['devices'] = None
+            cache = LoadDeviceCache()
+            cache['devices'] = []
+            if nice_name is not None:
+                cache['options'].pop(nice_name, None)
+            SaveDeviceCache(cache)
+
+    def CloseScanners():
+        # Close the Backend Session Kept Open Between Scans
+        with devicelock:
+            if devicecache['initialized']:
+                try:
+                    backend.exit()
+                except Exception:
+                    pass
+                devicecache['initialized'] = False
+                devicecache['devices'] = None
+
+    def SetScannerOption(device, nice_name, opt, candidates, key):
+        # Set a Scanner Option to the First Accepted Candidate and Return It, or None If None are Accepted
+        #    The Value Each Device Accepted is Remembered so Repeat Jobs Set It on the First Try
+        #    Rejections are Not Remembered - a Busy or Offline Device Rejects Everything for a While
+        with devicelock:
+            cache = LoadDeviceCache()
+            remembered = cache['options'].get(nice_name, {})
+        if remembered.get(key) is not None:
+            try:
+                # Long-Lived Session - Skip the Round Trip If the Device Already Has the Value
+                if device.options[opt].value == remembered[key]:
+                    return(remembered[key])
+            except Exception:
+                pass
+            candidates = [remembered[key]] + [value for value in candidates if value != remembered[key]]
+        accepted = None
+        for value in candidates:
+            try:
+                backend.set_scanner_opt(device, opt, [value])
+                accepted = value
+                break
+            except Exception:
+                pass
+        if remembered.get(key) != accepted:
+            with devicelock:
+                cache = LoadDeviceCache()
+                if accepted is None:
+                    cache['options'].get(nice_name, {}).pop(key, None)
+                else:
+                    cache['options'].setdefault(nice_name, {})[key] = accepted
+                SaveDeviceCache(cache)
+        return(accepted)
+
+    def CacheDirectory():
+        # Location of Persistent Caches
+        if os.name == 'nt':
+            cachedir = os.getenv('LOCALAPPDATA', os.path.expanduser('~'))
+        else:
+            cachedir = os.getenv('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache'))
+        return(os.path.join(cachedir, 'scan2pdf'))
+
+    def DeviceCacheFile():
+        # Location of the Persistent Device Cache
+        return(os.path.join(CacheDirectory(), 'devices.json'))
+
+    def LoadDeviceCache():
+        # Persistent Device Cache for the Current Backend, Read from Disk Once - Expired Device Lists are Dropped
+        if devicecache['saved'] is None:
+            devicecache['saved'] = {'time': 0, 'devices': [], 'options': {}}
+            try:
+                with open(DeviceCacheFile()) as f:
+                    devicecache['saved'].update(json.load(f).get(devicecache['backend'], {}))
+            except (OSError, ValueError, AttributeError):
+                pass
+        if time.time() - devicecache['saved']['time'] > options['device_ttl']:
+            devicecache['saved']['devices'] = []
+        return(devicecache['saved'])
+
+    def SaveDeviceCache(cache):
+        # Write the Persistent Device Cache, Ignoring Failures - It is Only an Optimization
+        #    Each Backend Has Its Own Entry, and Simulated Scanners are Not Saved
+        if devicecache['backend'].startswith('virtual'):
+            return
+        try:
+            cachefile = DeviceCacheFile()
+            saved = {}
+            try:
+                with open(cachefile) as f:
+                    saved = dict(json.load(f))
+            except (OSError, ValueError, TypeError):
+                pass
+            saved[devicecache['backend']] = cache
+            if not os.path.isdir(os.path.dirname(cachefile)):
+                os.makedirs(os.path.dirname(cachefile))
+            with open(cachefile + '.tmp', 'w') as f:
+                json.dump(saved, f, indent=2)
+            os.replace(cachefile + '.tmp', cachefile)
+        except OSError:
+            pass
+
+    def LazyImport(name):
+        # Return a Module That is Only Loaded When One of Its Attributes is First Used
+        #    A Missing Module Still Raises ImportError Here - Finding It is Cheap, Loading It is Not
+        #    Loading is Not Thread-Safe, so the First Use Must Be Under a Lock
+        if name in sys.modules:
+            return(sys.modules[name])
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ImportError('No module named ' + name)
+        spec.loader = importlib.util.LazyLoader(spec.loader)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+        return(module)
+
+    def ImportModules(ocr=False):
+        # Import the Imaging and PDF Modules, and the OCR Modules If Needed, Once - Called by Each
+        #    Code Path Before It Needs Them, so Startup and the Window Don't Wait for Modules Never Used
+        nonlocal PIL, numpy, img2pdf, pypdf, pyocr, pypdftk
+        with importlock:
+            if 'imaging' not in imported:
+                import PIL.Image
+                import PIL.ImageDraw
+                import PIL.ImageFont
+                import PIL.ImageSequence
+                import numpy
+                import img2pdf
+                try:
+                    import pypdf    # In-Process PDF Merge - Falls Back to pdftk If Not Installed
+                except ImportError:
+                    pypdf = None
+                imported.add('imaging')
+            if ocr and 'ocr' not in imported:
+                import pyocr
+                import pypdftk
+                imported.add('ocr')
+
+    def StartupMark(milestone):
+        # Record the Seconds from Startup to a Milestone, the First Time It is Reached
+        startup.setdefault(milestone, round(time.perf_counter() - startclock, 3))
+
+    def ReportStartup(window):
+        # Report How Long Startup Took to Each Milestone, Once, so Slow Startups are Noticed
+        if 'reported' in startup:
+            return
+        marks = dict(sorted(startup.items(), key=lambda mark: mark[1]))
+        startup['reported'] = True
+        WriteMetrics('startup', **marks)
+        if options['headless']:
+            LogEvent('startup', **marks)
+        else:
+            UpdateOutput(window, 'Startup: ' + ', '.join(milestone + ' ' + '{:.2f}'.format(seconds) + 's'
+                                                        for milestone, seconds in marks.items()) + '\n\n')
+
+    def UseBackend(spec):
+        # Switch to the Scanner Backend Named by the Specification, Closing Any Open Device Session
+        nonlocal backend
+        newbackend = SelectBackend(spec)
+        CloseScanners()
+        with devicelock:
+            backend = newbackend
+            devicecache['backend'] = spec
+            devicecache['saved'] = None
 
-    def ScanDocument(window, outfile, values):
+    def OutputFileName(outputdir, suffix=''):
+        # Generate a Unique Filename Based on Date and Time
+        return(os.path.join(
+            outputdir, 'scan_' + datetime.datetime.now().strftime("%Y-%m-%d-%H-%M-%S") + suffix + '.pdf'))
+
+    def ScanDocument(window, outfile, values, timings=None):
+        # Scan, Optionally OCR, and Save a Document - Stage Times are Added to 'timings' If Given
         funcname = 'ScanDocument'
+        if timings is None:
+            timings = {}
         try:
-            # Search for Available Scanners
+            ImportModules(values['ocr'])
+            # Look for the User Selected Scanner - Devices are Cached Between Scans
             UpdateOutput(window, 'Initializing Scanner...\n\n',
                          append_flag=False)
-            pyinsane2.init()
-            devices = pyinsane2.get_devices()
-            if (len(devices) <= 0):
-                UpdateOutput(window, 'Unable to Locate a Scanner!\n\n')
-                ShowError(funcname, 'Unable to Locate a Scanner!')
-                return
-            # Looked for the User Selected Scanner
-            for i in range(0, len(devices)):
-                if devices[i].nice_name.find(values['scanner']) > -1:
-                    device = devices[i]
-                    break
+            (device, nice_name) = OpenScanner(values['scanner'])
             # Update the Output Field with the Selected Scanner
-            try:
-                UpdateOutput(window, 'Selected Scanner: ' +
-                             str(device.nice_name) + '\n\n')
-            except:
+            if device is None:
                 UpdateOutput(
                     window, 'Unable to Locate Scanner Scanner: ' + str(values['scanner']) + '\n\n')
                 ShowError(
                     funcname, 'Unable to Locate Scanner Scanner: ' + str(values['scanner']))
                 return
+            UpdateOutput(window, 'Selected Scanner: ' +
+                         str(nice_name) + '\n\n')
             # Set Scanner Options
             UpdateOutput(window, 'Setting Scanner Options...\n')
 
             # Use Automatic Document Feeder or Flatbed
             if values['adf']:
-                try:
-                    pyinsane2.set_scanner_opt(
-                        device, 'source', ['ADF', 'Feeder'])
+                if SetScannerOption(device, nice_name, 'source', ['ADF', 'Feeder'], 'source:adf') is not None:
                     UpdateOutput(window, '\tSource: ADF\n')
                     multi = True
-                except PyinsaneException:
+                else:
                     UpdateOutput(window, '\tDocument Feeder Not Found\n')
                     multi = False
             else:
-                try:
-                    pyinsane2.set_scanner_opt(
-                        device, 'source', ['FlatBed', 'Auto'])
+                if SetScannerOption(device, nice_name, 'source', ['FlatBed', 'Flatbed', 'Auto'], 'source:glass') is not None:
                     UpdateOutput(window, '\tSource: Flatbed\n')
-                    multi = False
-                except:
+                else:
                     UpdateOutput(window, '\tSource: Not Set\n')
-                    multi = False
+                multi = False
             # Limit Scan Area to Letter Size Paper
             if values['letter']:
                 UpdateOutput(window, '\tPage Size: Letter\n')
             else:
                 try:
-                    pyinsane2.maximize_scan_area(device)
+                    backend.maximize_scan_area(device)
                 except:
                     pass
-            # Set Resolution to 300 dpi
-            try:
-                pyinsane2.set_scanner_opt(device, "resolution", [300])
-                UpdateOutput(window, '\tResolution: 300\n')
-            except:
-                UpdateOutput(window, '\tResolution: Not Set\n')
+            # Set Resolution (Default: 300 dpi)
+            dpi = options['scan_dpi']
+            resolution = SetScannerOption(device, nice_name, 'resolution', [dpi], 'resolution:' + str(dpi))
+            if resolution is not None:
+                UpdateOutput(window, '\tResolution: ' + str(dpi) + '\n')
+            else:
+                # The Resolution the Device Keeps is Still Needed to Size Its Pages
+                try:
+                    resolution = int(device.options['resolution'].value)
+                except Exception:
+                    resolution = None
+                UpdateOutput(window, '\tResolution: Not Set' +
+                             (' (Device: ' + str(resolution) + ')' if resolution else '') + '\n')
             # Set Scan Mode to 'Color' or 'Gray'
-            try:
-                if values['color']:
-                    pyinsane2.set_scanner_opt(device, 'mode', ['Color'])
-                    UpdateOutput(window, '\tMode: Color\n')
-                else:
-                    pyinsane2.set_scanner_opt(device, 'mode', ['Gray'])
-                    UpdateOutput(window, '\tMode: Gray\n')
-            except:
-                UpdateOutput(window, '\tMode: Not Set\n')
+            mode = SetScannerOption(device, nice_name, 'mode', ['Color'] if values['color'] else ['Gray'],
+                                    'mode:color' if values['color'] else 'mode:gray')
+            UpdateOutput(window, '\tMode: ' + (mode or 'Not Set') + '\n')
+
+            # Create a Working Directory and Start the Encode/OCR Stages Ahead of Acquisition
+            #    Each Page is Cropped, Encoded and OCR'd While the Next Page is Being Scanned
+            workdir = CreateWorkingDirectory()
+            pipeline = StartPipeline(workdir, values, outfile, timings)
 
             # Begin Scan
             UpdateOutput(window, '\nBeginning Scan...\n\n')
             try:
                 scan_session = device.scan(multiple=multi)
             except:
+                if not multi:
+                    ForgetDevices(nice_name)    # The Flatbed Can't Be Empty - the Cached Device May Be Gone
+                StopPipeline(pipeline)
+                shutil.rmtree(workdir)
                 UpdateOutput(window, 'Error: Document Feeder is Empty!')
                 ShowError(funcname, 'Error: Document Feeder is Empty!')
                 return
+            # Each Page is Taken from the Scan as Soon as It Completes - The Session's 'images' List is Never
+            #    Read, as pyinsane2 Sends Every Page of the Batch Again Each Time It is
+            #    The pyinsane2 Daemon Still Keeps Its Own Copy of Each Page Until the Session Ends
+            images = []
             num_pages = 0
             while True:
                 try:
                     while True:
                         try:
-                            scan_session.scan.read()
+                            TimedCall(timings, 'acquire', scan_session.scan.read)
                         except EOFError:
+                            images.append(scan_session.scan.get_image())
+                            # Pages from the Device Carry No Resolution - Cropping and Downsampling Need It
+                            if resolution:
+                                images[-1].info['dpi'] = (resolution, resolution)
                             UpdateOutput(window, "Scanned Page: " +
-                                         str(len(scan_session.images)) + "\n")
+                                         str(len(images)) + "\n")
+                            # Acquisition Time for This Page is the Read Time Since the Previous Page
+                            acquired = timings['acquire']['wall']
+                            PageMetrics(pipeline, len(images) - 1)['acquire'] = acquired - pipeline['acquired']
+                            pipeline['acquired'] = acquired
+                            # Hand the Completed Page Downstream Before Reading the Next One
+                            FeedPipeline(window, pipeline, images)
+                        DrainPipelineStatus(window, pipeline)
+                        if pipeline['abort'].is_set():
+                            raise StopIteration
                 except StopIteration:
                     err = None
-                if num_pages == len(scan_session.images):
+                except Exception as e:
+                    # A Jam or Lost Connection Mid-Feed Fails the Document - Pages Still Queued are Cancelled
+                    FailPipeline(pipeline, 'Scanner Error After Page ' + str(len(images)) + ': ' + str(e))
+                FeedPipeline(window, pipeline, images)
+                if num_pages == len(images) or pipeline['abort'].is_set():
                     break
                 else:
-                    num_pages = len(scan_session.images)
+                    num_pages = len(images)
                     if os.name == 'nt':  # pyinsane2 Times Out Waiting for Next Page in Windows
                         if multi:
                             UpdateOutput(
@@ -274,102 +1488,909 @@ def main(args):
                             sleep(20)
                     else:
                         break
-            # Get the Number of Pages Scanned from Scan Result
-            numpages = len(scan_session.images)
+            # The Connection to the Scanner is Kept Open for the Next Scan
+            numpages = len(images)
             UpdateOutput(window, "\nTotal Pages: " + str(numpages) + "\n")
-            if numpages == 0:
-                ShowError(
-                    funcname, 'No Pages Were Scanned from Selected Document Source!')
+            SetJobState('processing')
+            return(FinishDocument(window, funcname, pipeline, numpages))
+        except Exception as e:
+            ShowError(funcname, 'Error: ' + str(e))
+
+    def FinishDocument(window, funcname, pipeline, numpages):
+        # Wait for the Last Pages, Then Merge Them into the Output File - Returns True on Success
+        #    The Working Directory, and the Partial Output of a Failed Document, are Removed Either Way
+        try:
+            return(MergeDocument(window, funcname, pipeline, numpages))
+        finally:
+            try:
+                if os.path.isfile(pipeline['partfile']):
+                    os.remove(pipeline['partfile'])
+            except OSError:
+                pass
+            shutil.rmtree(pipeline['workdir'], ignore_errors=True)
+
+    def MergeDocument(window, funcname, pipeline, numpages):
+        # Merge the Pages of a Document into the Output File - Returns True on Success
+        (workdir, values, timings) = (pipeline['workdir'], pipeline['values'], pipeline['timings'])
+        # The Document is Written Under a Temporary Name so an Interrupted Run Never Leaves a Partial Output File
+        (outfile, partfile) = (pipeline['outfile'], pipeline['partfile'])
+        # Wait for the Remaining Pages to Finish Encoding and OCR
+        pages = FinishPipeline(window, funcname, pipeline)
+        if pages is None:
+            return
+        if numpages == 0:
+            ShowError(
+                funcname, 'No Pages Were Scanned from Selected Document Source!')
+            return
+
+        # Verify at Least One Page Got Created
+        if len(pages) == 0 and pipeline['dropped'] == numpages:
+            UpdateOutput(window, '\nEvery Page Scanned Was Blank!\n')
+            ShowError(funcname, 'Every Page Scanned Was Blank!')
+            return
+        if len(pages) == 0:
+            # Display an Error and Return
+            UpdateOutput(window, '\nUnable to Locate Scanned Image Files!')
+            ShowError(funcname, 'Unable to Locate Scanned Image Files!')
+            return
+        # Merge OCR Pages If Option Selected
+        if values['ocr'] and pipeline['merger'] is not None:
+            # Pages Were Already Merged In-Process as OCR Completed
+            UpdateOutput(window, '\nMerged ' + str(pipeline['merged'] - pipeline['dropped']) + ' Page(s)\n')
+        elif values['ocr']:
+            UpdateOutput(window, '\n\nCollecting Pages...\n')
+            try:
+                if os.name == 'nt':  # pypdftk can't find executable in Windows
+                    if ShowError(funcname, ExecuteCommandSubprocess(window, PDFTK_PATH, os.path.join(workdir, 'scan_*-new.pdf'), 'cat', 'output', partfile), True) == True:
+                        return
+                else:
+                    result = TimedCall(timings, 'merge', pypdftk.concat, pages, partfile)
+            except Exception as e:
+                # pypdftk Reports Some Warnings as Errors - The Output File Check Below Decides
+                UpdateOutput(window, 'pdftk Error: ' + str(e) + '\n')
+        else:
+            # Convert Pages to PDF and Merge to Output File
+            UpdateOutput(window, '\n\nCollecting Image Files as PDF...\n')
+            try:
+                # Each Page is Sized from Its Pixels and Resolution
+                layout_fun = img2pdf.default_layout_fun
+                if values['letter']:
+                    # Convert to Letter Size Paper
+                    layout = (img2pdf.mm_to_pt(215.9),
+                              img2pdf.mm_to_pt(279.4))
+                    layout_fun = img2pdf.get_layout_fun(layout)
+                # elif values['A4'] == True:
+                #    layout = (img2pdf.mm_to_pt(210), img2pdf.mm_to_pt(297)) # A4 Size Paper
+                with open(partfile, "wb") as f:
+                    f.write(TimedCall(timings, 'img2pdf', lambda: img2pdf.convert(pages, layout_fun=layout_fun)))
+            except Exception as e:
+                UpdateOutput(window, 'img2pdf Error: ' + str(e))
+                ShowError(funcname, 'img2pdf Error: ' + str(e))
                 return
+        # Verify Output File was Created
+        if os.path.isfile(partfile) == False:
+            # Display an Error and Return
+            UpdateOutput(window, '\nUnable to Locate Output PDF File!\n')
+            ShowError(funcname, 'Unable to Locate Output PDF File!')
+            return
+        os.replace(partfile, outfile)
+        UpdateOutput(window, '\nDocument Saved to: ' + outfile + '\n')
+        ReportDocumentMetrics(window, pipeline, numpages)
+        # Announce Completion
+        PlaySound('complete')
+        return True
 
-            # Create a Working Directory
-            workdir = CreateWorkingDirectory()
+    def OCRPage(page, workdir, abort, textonly=False):
+        # OCR a Single Page to a Searchable PDF - Runs in an OCR Worker Thread
+        #    With textonly the PDF Holds Only the Invisible Text, to Be Laid Over the Encoded Page Image
+        #    Returns the Output PDF File, the Command Output and Any Error Text
+        pdfbase = os.path.join(workdir, 'scan_' + str(page['index']+1).zfill(6) + '-new')
+        if abort.is_set():
+            return (None, None, None)
+        # A Page Seen Before Costs a Hash and a File Copy Instead of OCR
+        cachekey = None
+        if options['ocr_cache_mb'] > 0:
+            try:
+                cachekey = OCRCacheKey(page, textonly)
+                page['cached'] = FetchOCRCache(cachekey, pdfbase + '.pdf')
+                if page['cached']:
+                    return (pdfbase + '.pdf', None, None)
+            except (OSError, ValueError):
+                cachekey = None
+        # pyocr.libtesseract (which is much faster) doesn't work in Windows
+        if os.name == 'nt':
+            textargs = ['-c', 'textonly_pdf=1'] if textonly else []
+            cmdoutput = ExecuteCommandSubprocess(None, tesseract, '-l', 'eng', *textargs, page['file'],
+                                                 pdfbase, 'pdf', update_form=False)
+            if cmdoutput is None:
+                return (None, None, 'Unable to Execute: ' + tesseract)
+            errtext = ParseCommandError(cmdoutput)
+            if errtext is None and cachekey is not None:
+                StoreOCRCache(cachekey, pdfbase + '.pdf')
+            return (pdfbase + '.pdf', cmdoutput, errtext)
+        try:
+            if page['image'] is not None:
+                # In-Memory Page - libtesseract Reads the Pixels Directly
+                pyocr.libtesseract.image_to_pdf(page['image'], pdfbase, textonly=textonly)  # .pdf will be appended
+            else:
+                with PIL.Image.open(page['file']) as image:
+                    pyocr.libtesseract.image_to_pdf(image, pdfbase, textonly=textonly)
+        except Exception as e:
+            return (None, None, 'PyOCR Error: ' + str(e))
+        if cachekey is not None:
+            StoreOCRCache(cachekey, pdfbase + '.pdf')
+        return (pdfbase + '.pdf', None, None)
+
+    def OCRCacheKey(page, textonly):
+        # Cache Key for a Page's OCR Result - a Hash of the Page Pixels, the OCR Engine and Its Settings
+        if ocrcache['engine'] is None:
+            try:
+                ocrcache['engine'] = ('tesseract.exe' if os.name == 'nt' else
+                                      'libtesseract ' + '.'.join(str(x) for x in pyocr.libtesseract.get_version()))
+            except Exception:
+                ocrcache['engine'] = 'tesseract'
+        digest = hashlib.sha256()
+        image = page['image'] if page['image'] is not None else PIL.Image.open(page['file'])
+        digest.update(repr((ocrcache['engine'], 'eng', textonly, image.mode, image.size,
+                            image.info.get('dpi'))).encode('utf-8'))
+        digest.update(image.tobytes())
+        if page['image'] is None:
+            image.close()
+        return(digest.hexdigest())
+
+    def FetchOCRCache(key, pdffile):
+        # Copy a Cached OCR Result to the Working Directory - Returns False If the Page is Not Cached
+        cachefile = os.path.join(CacheDirectory(), 'ocr', key + '.pdf')
+        try:
+            shutil.copyfile(cachefile, pdffile)
+            os.utime(cachefile)    # Most Recently Used
+        except OSError:
+            return False
+        return True
+
+    def StoreOCRCache(key, pdffile):
+        # Copy an OCR Result into the Cache, Evicting the Least Recently Used Results Over the Size Limit
+        #    Failures are Ignored - the Cache is Only an Optimization
+        cachedir = os.path.join(CacheDirectory(), 'ocr')
+        cachefile = os.path.join(cachedir, key + '.pdf')
+        try:
+            if not os.path.isdir(cachedir):
+                os.makedirs(cachedir, exist_ok=True)
+            partfile = cachefile + '.' + str(threading.get_ident()) + '.tmp'
+            shutil.copyfile(pdffile, partfile)
+            os.replace(partfile, cachefile)
+            with ocrcachelock:
+                if ocrcache['size'] is None:
+                    ocrcache['size'] = EvictOCRCache(cachedir, None)
+                else:
+                    ocrcache['size'] += os.path.getsize(cachefile)
+                if ocrcache['size'] > options['ocr_cache_mb'] * 1024 * 1024:
+                    ocrcache['size'] = EvictOCRCache(cachedir, options['ocr_cache_mb'] * 1024 * 1024)
+        except OSError:
+            pass
+
+    def EvictOCRCache(cachedir, limit):
+        # Remove the Least Recently Used Results Until the Cache is Well Under the Limit, and Return Its Size
+        #    Evicting to 90% of the Limit Means the Directory is Only Scanned Every Few Stores
+        entries = []
+        for name in os.listdir(cachedir):
+            try:
+                stat = os.stat(os.path.join(cachedir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, os.path.join(cachedir, name)))
+        size = sum(entry[1] for entry in entries)
+        if limit is None:
+            return(size)
+        for (mtime, filesize, filename) in sorted(entries):
+            if size <= limit * 0.9:
+                break
+            try:
+                os.remove(filename)
+                size -= filesize
+            except OSError:
+                pass
+        return(size)
+
+    def StorePage(pipeline, idx, image, metrics, ocr):
+        # Keep an Encoded Page in Memory, or Spill It to the Working Directory
+        #    Pages Spill to Disk Once the Pages Held in Memory Would Exceed the Spill Threshold
+        #    'image'/'file' is the Page for OCR, 'data'/'datafile' the Encoded Image Embedded in the PDF
+        workfile = os.path.join(pipeline['workdir'], 'scan_' + str(idx+1).zfill(6))
+        page = {'index': idx, 'image': None, 'file': None, 'bytes': 0,
+                'data': None, 'datafile': None, 'databytes': 0}
+        scanned = image
+        image = Resample(scanned, options['image_dpi'])
+        if not ocr or pipeline['overlay']:
+            # img2pdf Embeds JPEG, PNG and Group 4 Data As-Is - Encode Once and Keep or Spill the Bytes
+            (data, extension, metrics['class']) = EncodePageImage(image)
+            if options['in_memory'] and ReservePageMemory(pipeline, len(data)):
+                page['data'] = data
+                page['databytes'] = len(data)
+            else:
+                page['datafile'] = workfile + extension
+                with open(page['datafile'], 'wb') as f:
+                    f.write(data)
+        if ocr:
+            if pipeline['overlay']:
+                # The Text Layer is Scaled Onto the Page Image, so OCR Can Use Its Own Resolution
+                image = Resample(scanned, options['ocr_dpi'])
+            # tesseract.exe Can Only Read Pages from Disk
+            if options['in_memory'] and os.name != 'nt':
+                # OCR Reads the Pixels Directly - Hold the Uncompressed Image Until OCR Completes
+                size = image.width * image.height * len(image.getbands())
+                if ReservePageMemory(pipeline, size):
+                    page['image'] = image
+                    page['bytes'] = size
+                    return(page)
+            page['file'] = workfile + '.tif'
+            image.save(page['file'], compression='tiff_lzw', dpi=image.info.get('dpi', (300, 300)))
+        return(page)
+
+    def Resample(image, dpi):
+        # Downsample a Page to a Lower Resolution, Keeping Its Size on Paper - Never Upsamples
+        current = image.info.get('dpi', (300, 300))
+        if dpi <= 0 or dpi >= min(current):
+            return(image)
+        size = (max(1, int(round(image.width * dpi / current[0]))), max(1, int(round(image.height * dpi / current[1]))))
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('L')    # Black and White Pages Come Back Gray, and are Encoded as Bitonal Again
+        resampled = image.resize(size, PIL.Image.LANCZOS, reducing_gap=2.0)
+        resampled.info['dpi'] = (dpi, dpi)
+        return(resampled)
 
-            # Output Each Image as a TIFF File
-            pages = []  # List of Pages to Process
-            for idx in range(0, numpages):
-                workfile = os.path.join(
-                    workdir, 'scan_' + str(idx+1).zfill(6) + '.tif')
-                image = scan_session.images[idx]
+    def EncodePageImage(image):
+        # Encode a Page Image to Suit Its Content - Returns the Encoded Data, File Extension and Page Class
+        #    Black and White Text --> CCITT Group 4, Photographs --> JPEG, Few Flat Colors --> Flate (PNG)
+        dpi = image.info.get('dpi', (300, 300))
+        buffer = io.BytesIO()
+        if options['encoding'] != 'adaptive':
+            image.save(buffer, format='PNG', dpi=dpi)
+            return((buffer.getvalue(), '.png', 'lossless'))
+        (pageclass, threshold, fewcolors) = ClassifyPage(image)
+        if pageclass == 'bitonal':
+            if image.mode != '1':
+                image = image.convert('L').point([0] * threshold + [255] * (256 - threshold), '1')
+            # A Single Strip Lets img2pdf Embed the Group 4 Data Without Decoding It
+            image.save(buffer, format='TIFF', compression='group4', dpi=dpi, tiffinfo={278: image.height})
+            return((buffer.getvalue(), '.tif', pageclass))
+        if pageclass == 'gray' and image.mode != 'L':
+            image = image.convert('L')
+        if fewcolors:
+            image.save(buffer, format='PNG', dpi=dpi)
+            return((buffer.getvalue(), '.png', pageclass))
+        image.save(buffer, format='JPEG', quality=options['jpeg_quality'], dpi=dpi)
+        return((buffer.getvalue(), '.jpg', pageclass))
+
+    def ClassifyPage(image):
+        # Classify a Page as 'bitonal', 'gray' or 'color' from Every Fourth Pixel in Each Direction
+        #    Returns the Class, a Black/White Threshold for Bitonal Pages and Whether the Page Has Few Colors
+        if image.mode == '1':
+            return(('bitonal', 128, True))
+        sample = image.resize((max(1, image.width // 4), max(1, image.height // 4)), PIL.Image.NEAREST)
+        pixels = numpy.asarray(sample)
+        pageclass = 'gray'
+        if pixels.ndim == 3:
+            pixels = pixels[:, :, :3].astype(numpy.uint32)
+            # Scanner Noise Leaves Gray Paper Slightly Tinted - Only Clearly Colored Pixels Count
+            chroma = pixels.max(axis=2) - pixels.min(axis=2)
+            if numpy.count_nonzero(chroma > 32) > 0.001 * chroma.size:
+                pageclass = 'color'
+            gray = numpy.asarray(sample.convert('L'))
+        else:
+            gray = pixels
+        histogram = numpy.bincount(gray.ravel(), minlength=256)
+        if pageclass == 'gray' and histogram[48:208].sum() < options['bitonal_midtones'] * gray.size and \
+                not MidtoneBlock(gray):
+            pageclass = 'bitonal'
+        # Otsu's Threshold - the Split Maximizing the Variance Between Ink and Paper
+        below = numpy.cumsum(histogram).astype(numpy.float64)
+        above = below[-1] - below
+        sums = numpy.cumsum(histogram * numpy.arange(256)).astype(numpy.float64)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            between = below * above * (sums / below - (sums[-1] - sums) / above) ** 2
+        threshold = int(numpy.nanargmax(numpy.where((below > 0) & (above > 0), between, -1))) + 1
+        # Drawings and Forms are Nearly All a Few Flat Colors - Scanned Photographs Never Are
+        if pageclass == 'color':
+            counts = numpy.unique((pixels[:, :, 0] << 16) | (pixels[:, :, 1] << 8) | pixels[:, :, 2],
+                                  return_counts=True)[1]
+            fewcolors = numpy.sort(counts)[-256:].sum() >= 0.99 * gray.size
+        else:
+            fewcolors = numpy.sort(histogram)[-32:].sum() >= 0.99 * gray.size
+        return((pageclass, threshold, fewcolors))
+
+    def MidtoneBlock(gray, tile=32):
+        # True If Any Block of the Page Holds Midtones Away from Ink - a Photo, Gray Logo or Light Signature
+        #    That Black and White Would Destroy - Rather than Only the Soft Edges Around Text
+        #    Blocks are About Half an Inch on the Quarter-Resolution Sample of a 300 dpi Page
+        (rows, columns) = (gray.shape[0] // tile, gray.shape[1] // tile)
+        if rows == 0 or columns == 0:
+            return(False)
+        gray = gray[:rows * tile, :columns * tile]
+        # Ink and the Pixels Beside It
+        ink = gray < 48
+        ink[1:] |= gray[:-1] < 48
+        ink[:-1] |= gray[1:] < 48
+        ink[:, 1:] |= ink[:, :-1].copy()
+        ink[:, :-1] |= ink[:, 1:].copy()
+        midtones = (gray >= 48) & (gray < 208) & ~ink
+        return(midtones.reshape(rows, tile, columns, tile).mean(axis=(1, 3)).max() > 0.1)
+
+    def ReservePageMemory(pipeline, size):
+        # Account for a Page Held in Memory - Returns False If It Must Spill to Disk Instead
+        with pipeline['lock']:
+            if pipeline['memory'] + size > options['spill_mb'] * 1024 * 1024:
+                return False
+            pipeline['memory'] += size
+            return True
+
+    def ReleasePage(pipeline, page, data=True):
+        # Drop an In-Memory Page Once No Later Stage Needs It
+        #    With data=False Only the Page for OCR is Dropped - the Encoded Image Waits for the Merge
+        with pipeline['lock']:
+            pipeline['memory'] -= page['bytes'] + (page['databytes'] if data else 0)
+        page['image'] = None
+        page['bytes'] = 0
+        if data:
+            page['data'] = None
+            page['databytes'] = 0
+
+    def StartPipeline(workdir, values, outfile, timings):
+        # Start the Background Stages of the Scan Pipeline
+        #    Acquisition --> [Bounded Queue] --> Encode Thread --> [Bounded] --> OCR Worker Pool --> Merge Thread
+        #    Queues are Bounded so a Long Document Never Holds More than a Few Pages in Flight
+        pipeline = {
+            'workdir': workdir,
+            'values': values,
+            'outfile': outfile,
+            'partfile': outfile + '.part',    # Written Until the Document is Complete, Then Renamed to outfile
+            'timings': timings,      # Stage --> Accumulated Wall/CPU Time
+            'encode': queue.Queue(maxsize=options['queue_depth']),    # Pages Waiting to Be Encoded
+            'status': queue.Queue(),                                  # Status Lines for the Output Field
+            'ocrslots': threading.BoundedSemaphore(options['ocr_workers'] + options['queue_depth']),
+            'pool': None,
+            'sharedpool': False,     # The Pool Belongs to the Scheduler, Not This Document
+            'futures': [],
+            'collected': 0,          # Number of OCR Futures Whose Pages Have Been Collected
+            'abort': threading.Event(),
+            'lock': threading.Lock(),
+            'error': None,
+            'fed': 0,                # Number of Pages Handed to the Pipeline
+            'results': {},           # Page Index --> Encoded Page Data/File or OCR PDF File
+            'memory': 0,             # Bytes of Page Data Currently Held in Memory
+            'imagesize': None,       # Size of the Last Page Scanned
+            'dropped': 0,            # Number of Blank Pages Left Out of the Output
+            'merge': queue.Queue(),  # OCR'd Pages Waiting to Be Appended to the Output File
+            'merger': None,
+            'overlay': False,        # OCR Text is Laid Over the Encoded Page Images by the Merge Thread
+            'merged': 0,             # Number of Pages Appended to the Output File
+            'started': time.perf_counter(),
+            'acquired': 0.0,         # Acquisition Time Up to the Last Page Scanned
+            'pagemetrics': {},       # Page Index --> Stage Times, Bytes Written and OCR Characters
+            'written': 0,            # Bytes Written to the Working Directory
+        }
+        if values['ocr'] and scheduler['pool'] is not None:
+            # Jobs Share the Scheduler's Pool - Rather than Wait for a Free Worker, Pages Queue Up in It, Spilling
+            #    to Disk Past the Memory Limit, so Acquisition Never Waits on Another Job's OCR
+            #    Ingested Documents Have No Scanner to Hold Up, and Keep Waiting for a Free Worker
+            pipeline['pool'] = scheduler['pool']
+            pipeline['sharedpool'] = True
+            if not values.get('ingest'):
+                pipeline['ocrslots'] = None
+        elif values['ocr']:
+            pipeline['pool'] = concurrent.futures.ThreadPoolExecutor(max_workers=options['ocr_workers'])
+        if values['ocr'] and pypdf is not None:
+            pipeline['overlay'] = options['encoding'] == 'adaptive'
+            pipeline['merger'] = threading.Thread(target=MergeStage, args=(pipeline,), daemon=True)
+            pipeline['merger'].start()
+        pipeline['encoder'] = threading.Thread(target=EncodeStage, args=(pipeline,), daemon=True)
+        pipeline['encoder'].start()
+
+        return(pipeline)
+
+    def FeedPipeline(window, pipeline, images):
+        # Hand Any Newly Scanned Pages to the Encode Stage, Waiting While the Queue is Full
+        #    'images' Holds Every Page Taken So Far - Handed Off Pages are Released from It so
+        #    Memory Holds Only the Pages in Flight, However Long the Batch
+        while pipeline['fed'] < len(images) and not pipeline['abort'].is_set():
+            try:
+                pipeline['encode'].put((pipeline['fed'], images[pipeline['fed']]), timeout=0.1)
+                if options['release_pages']:
+                    images[pipeline['fed']] = None    # Keep the List Length - It is Still the Page Count
+                pipeline['fed'] += 1
+            except queue.Full:
+                pass
+            DrainPipelineStatus(window, pipeline)
+
+    def EncodeStage(pipeline):
+        # Crop and Store Each Page, Then Queue It for OCR - Runs in the Encode Thread
+        values = pipeline['values']
+        while True:
+            item = pipeline['encode'].get()
+            if item is None:
+                break
+            if pipeline['abort'].is_set():
+                continue    # Keep Draining the Queue so Acquisition Never Blocks
+            (idx, image) = item
+            item = None
+            metrics = PageMetrics(pipeline, idx)
+            try:
                 imagesize = image.size
+                dpi = image.info.get('dpi', (300, 300))    # Ingested Files Keep Their Own Resolution
+                image.info['dpi'] = dpi
+                clock = StageClock()
                 if values['letter'] == True:
-                    image = image.crop((0, 0, 2550, 3300))
-                else:
-                    image = image.resize(imagesize)
-                image.save(workfile, compression='tiff_lzw', dpi=(300, 300))
-                pages.append(workfile)
-            # Close Connection to Scanner
-            pyinsane2.exit()
-            # Verify at Least One Page Got Created
-            if os.path.isfile(os.path.join(workdir, 'scan_000001.tif')) == False:
-                # Display an Error and Return
-                UpdateOutput(window, '\nUnable to Locate Scanned Image Files!')
-                ShowError(funcname, 'Unable to Locate Scanned Image Files!')
-                return
-            # OCR Pages If Option Selected
-            if values['ocr']:
-                # OCR Each Page
-                pages = []    # List of Pages to Process
-                for idx in range(0, numpages):
-                    UpdateOutput(
-                        window, '\nRunning OCR on Page: ' + str(idx+1) + '\n')
-                    workfile = os.path.join(
-                        workdir, 'scan_' + str(idx+1).zfill(6) + '.tif')
-                    # pyocr.libtesseract (which is much faster) doesn't work in Windows
-                    if os.name == 'nt':
-                        if ShowError(funcname, ExecuteCommandSubprocess(window, tesseract, '-l',  'eng', workfile, workfile.replace('.tif', '-new'), 'pdf'), True) == True:
-                            return
-                    else:
-                        try:
-                            pyocr.libtesseract.image_to_pdf(PIL.Image.open(
-                                workfile), workfile.replace('.tif', '-new'))  # .pdf will be appended
-                        except Exception as e:
-                            UpdateOutput(window, 'PyOCR Error: ' + str(e))
-                            ShowError(funcname, 'PyOCR Error: ' + str(e))
-                            return
-                    pages.append(workfile.replace('.tif', '-new.pdf'))
-                UpdateOutput(window, '\n\nCollecting Pages...\n')
+                    image = image.crop((0, 0, int(round(dpi[0] * 8.5)), int(round(dpi[1] * 11))))
+                elif options['autocrop'] and not values.get('ingest'):
+                    # Ingested Files are Taken as Already Cropped
+                    box = ContentBox(image)
+                    if box is not None:
+                        image = image.crop(box)
+                RecordStage(pipeline['timings'], 'crop', clock, metrics)
+                if options['deskew']:
+                    # After Cropping, So Little Scanner Bed is Left to Throw Off the Angle
+                    image = TimedCall(pipeline['timings'], 'deskew', Deskew, image, metrics=metrics)
+                image.info['dpi'] = dpi
+                blank = False
+                if options['blank_pages'] == 'drop' or (options['blank_pages'] == 'keep' and values['ocr']):
+                    metrics['ink'] = TimedCall(pipeline['timings'], 'blankcheck', InkCoverage, image, metrics=metrics)
+                    blank = metrics['ink'] < options['blank_ink']
+                if blank and options['blank_pages'] == 'drop':
+                    DropPage(pipeline, idx)
+                    pipeline['imagesize'] = imagesize
+                    continue
+                page = TimedCall(pipeline['timings'], 'encode', StorePage, pipeline, idx, image, metrics,
+                                 values['ocr'] and not blank, metrics=metrics)
+                image = None
+                pipeline['imagesize'] = imagesize
+                for filename in (page['file'], page['datafile']):
+                    if filename is not None:
+                        CountWritten(pipeline, metrics, filename)
+            except Exception as e:
+                FailPipeline(pipeline, 'Encode Error on Page ' + str(idx+1) + ': ' + str(e))
+                continue
+            if pipeline['pool'] is None:
+                pipeline['results'][idx] = page['data'] if page['data'] is not None else page['datafile']
+                PageDone(pipeline, idx)
+                continue
+            if blank:
                 try:
-                    if os.name == 'nt':  # pypdftk can't find executable in Windows
-                        if ShowError(funcname, ExecuteCommandSubprocess(window, PDFTK_PATH, os.path.join(workdir, 'scan_*-new.pdf'), 'cat', 'output', outfile), True) == True:
-                            return
-                    else:
-                        result = pypdftk.concat(pages, out_file=outfile)
+                    PassBlankPage(pipeline, page, metrics)
                 except Exception as e:
-                    pass    # pypdftk reports as error, but still works
-            else:
-                # Convert Pages to PDF and Merge to Output File
-                UpdateOutput(window, '\n\nCollecting Image Files as PDF...\n')
+                    FailPipeline(pipeline, 'Encode Error on Page ' + str(idx+1) + ': ' + str(e))
+                continue
+            # Limit the Number of Pages Waiting for an OCR Worker
+            if pipeline['ocrslots'] is not None:
+                pipeline['ocrslots'].acquire()
+            if pipeline['abort'].is_set():
+                if pipeline['ocrslots'] is not None:
+                    pipeline['ocrslots'].release()
+                ReleasePage(pipeline, page)
+                continue
+            future = pipeline['pool'].submit(TimedCall, pipeline['timings'], 'ocr',
+                                             OCRPage, page, pipeline['workdir'], pipeline['abort'],
+                                             pipeline['overlay'], metrics=metrics)
+            future.add_done_callback(lambda future, page=page: OCRStageDone(pipeline, page, future))
+            with pipeline['lock']:
+                pipeline['futures'].append(future)
+
+    def ContentBox(image):
+        # Bounds of Whatever Differs from the Scanner Bed Showing Around the Edges - the Paper on a Dark Bed,
+        #    or the Printed Area on a White One - Plus a Quarter Inch, or None If Nothing Stands Out
+        #    Found on a Quarter-Resolution Copy, Ignoring Rows and Columns with Only a Speck of Dust
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('L')
+        pixels = numpy.asarray(image.reduce(4).convert('L')).astype(numpy.int16)
+        border = numpy.concatenate((pixels[0], pixels[-1], pixels[:, 0], pixels[:, -1]))
+        differs = numpy.abs(pixels - int(numpy.median(border))) > 48
+        rows = numpy.flatnonzero(differs.sum(axis=1) > 2)
+        columns = numpy.flatnonzero(differs.sum(axis=0) > 2)
+        if len(rows) == 0 or len(columns) == 0:
+            return(None)
+        margin = int(image.info.get('dpi', (300, 300))[0]) // 4
+        return((max(0, int(columns[0]) * 4 - margin), max(0, int(rows[0]) * 4 - margin),
+                min(image.width, (int(columns[-1]) + 1) * 4 + margin), min(image.height, (int(rows[-1]) + 1) * 4 + margin)))
+
+    def Deskew(image):
+        # Straighten a Page Fed in Crooked - Text Lines Give the Sharpest Horizontal Projection When Level
+        #    Every Candidate Angle is Scored at Once from the Ink Pixels of a Quarter-Resolution Copy
+        gray = image if image.mode in ('L', 'RGB') else image.convert('L')
+        pixels = numpy.asarray(gray.reduce(4).convert('L'))
+        (y, x) = numpy.nonzero(pixels < numpy.median(pixels) - 64)
+        if len(y) < 500:
+            return(image)    # Too Little Ink to Judge
+        step = max(1, len(y) // 100000)
+        (y, x) = (y[::step].astype(numpy.float64), x[::step].astype(numpy.float64))
+        angles = numpy.radians(numpy.arange(-5.0, 5.01, 0.2))
+        scores = []
+        for angle in angles:
+            rows = numpy.round(y - x * numpy.tan(angle)).astype(numpy.int64)
+            counts = numpy.bincount(rows - rows.min())
+            scores.append(numpy.dot(counts, counts))
+        angle = numpy.degrees(angles[int(numpy.argmax(scores))])
+        if abs(angle) < 0.1:
+            return(image)
+        return(image.rotate(angle, resample=PIL.Image.BILINEAR, fillcolor='white'))
+
+    def InkCoverage(image):
+        # Fraction of a Page Covered by Ink, Measured on a Quarter-Resolution Copy
+        #    Ink is Anything Clearly Lighter or Darker than the Paper - Light Show-Through from the Back of
+        #    the Sheet and Shadows Along the Edges of the Scan are Ignored
+        #    Only Bright Paper Can Be Blank - a Dark Page (Photo, Cover, Reversed Text) Counts as Fully Inked
+        if image.mode not in ('L', 'RGB'):
+            image = image.convert('L')
+        pixels = numpy.asarray(image.reduce(4).convert('L'))
+        (height, width) = pixels.shape
+        pixels = pixels[height // 20:height - height // 20, width // 20:width - width // 20]
+        if pixels.size == 0:
+            return(0.0)
+        paper = numpy.median(pixels)
+        if paper < 160:
+            return(1.0)
+        return(numpy.count_nonzero(numpy.abs(pixels.astype(numpy.int16) - int(paper)) > 64) / float(pixels.size))
+
+    def DropPage(pipeline, idx):
+        # Leave a Blank Page Out of the Output Document
+        metrics = PageMetrics(pipeline, idx)
+        metrics['blank'] = 'dropped'
+        with pipeline['lock']:
+            pipeline['dropped'] += 1
+        if pipeline['merger'] is not None:
+            pipeline['merge'].put((idx, None, None))    # The Merge Thread Still Counts It, Keeping Page Order
+        else:
+            PageDone(pipeline, idx)
+
+    def PassBlankPage(pipeline, page, metrics):
+        # Pass a Blank Page Through to the Output Document Without OCR
+        idx = page['index']
+        metrics['blank'] = 'kept'
+        imagedata = page['data'] if page['data'] is not None else page['datafile']
+        if pipeline['merger'] is not None:
+            pipeline['results'][idx] = imagedata
+            pipeline['merge'].put((idx, None, page))
+            return
+        # pdftk Collects One PDF File per Page
+        pdffile = os.path.join(pipeline['workdir'], 'scan_' + str(idx+1).zfill(6) + '-new.pdf')
+        with open(pdffile, 'wb') as f:
+            f.write(img2pdf.convert(imagedata))
+        ReleasePage(pipeline, page)
+        pipeline['results'][idx] = pdffile
+        CountWritten(pipeline, metrics, pdffile)
+        PageDone(pipeline, idx)
+
+    def OCRStageDone(pipeline, page, future):
+        # Collect the Result of One OCR Page - Runs in the OCR Worker Thread
+        #    Pages are Counted Once Collected - a Future is Done Just Before Its Callback Runs
+        try:
+            CollectOCRPage(pipeline, page, future)
+        finally:
+            with pipeline['lock']:
+                pipeline['collected'] += 1
+
+    def CollectOCRPage(pipeline, page, future):
+        # Release an OCR'd Page's Slot and Memory, and Pass Its PDF On to the Merge Thread
+        if pipeline['ocrslots'] is not None:
+            pipeline['ocrslots'].release()
+        ReleasePage(pipeline, page, data=False)
+        idx = page['index']
+        if future.cancelled() or pipeline['abort'].is_set():
+            ReleasePage(pipeline, page)
+            return
+        (pdffile, cmdoutput, errtext) = future.result()
+        if page.get('cached'):
+            PageMetrics(pipeline, idx)['ocrcache'] = True
+        if cmdoutput:
+            pipeline['status'].put(cmdoutput)
+        if errtext is not None:
+            FailPipeline(pipeline, 'OCR Failed on Page: ' + str(idx+1) + '\n' + errtext)
+            return
+        pipeline['results'][idx] = pdffile
+        CountWritten(pipeline, PageMetrics(pipeline, idx), pdffile)
+        pipeline['merge'].put((idx, pdffile, page))
+        pipeline['status'].put('OCR Complete: Page ' + str(idx+1) + ' (' + str(len(pipeline['results'])) +
+                               ' of ' + str(pipeline['fed']) + ' Scanned)\n')
+        if pipeline['merger'] is None:
+            PageDone(pipeline, idx)
+
+    def MergeStage(pipeline):
+        # Append OCR'd Pages to the Output Document in Page Order as They Complete - Runs in the Merge Thread
+        #    Pages Finishing Out of Order Wait Until Every Earlier Page Has Been Appended
+        writer = pypdf.PdfWriter()
+        fonts = {}    # Font Digest --> Font Object Already in the Output Document
+        pending = {}
+        while True:
+            item = pipeline['merge'].get()
+            if item is None:
+                break
+            if pipeline['abort'].is_set():
+                continue
+            (idx, pdffile, page) = item
+            pending[idx] = (pdffile, page)
+            while pipeline['merged'] in pending:
+                metrics = PageMetrics(pipeline, pipeline['merged'])
+                (pdffile, page) = pending.pop(pipeline['merged'])
+                if page is None:
+                    # Dropped Blank Page
+                    PageDone(pipeline, pipeline['merged'])
+                    pipeline['merged'] += 1
+                    continue
+                imagedata = page['data'] if page['data'] is not None else page['datafile']
                 try:
-                    # Read Image Size from Last Page Scanned and Convert Pixels to mm to points
-                    layout = (img2pdf.mm_to_pt(
-                        imagesize[0] * 0.264583333), img2pdf.mm_to_pt(imagesize[1] * 0.264583333))
-                    if values['letter']:
-                        # Convert to Letter Size Paper
-                        layout = (img2pdf.mm_to_pt(215.9),
-                                  img2pdf.mm_to_pt(279.4))
-                    # elif values['A4'] == True:
-                    #    layout = (img2pdf.mm_to_pt(210), img2pdf.mm_to_pt(297)) # A4 Size Paper
-                    layout_fun = img2pdf.get_layout_fun(layout)
-                    with open(outfile, "wb") as f:
-                        f.write(img2pdf.convert(pages, layout_fun=layout_fun))
+                    metrics['chars'] = TimedCall(pipeline['timings'], 'merge', MergePage, writer,
+                                                 pdffile, fonts, imagedata, metrics=metrics)
                 except Exception as e:
-                    UpdateOutput(window, 'img2pdf Error: ' + str(e))
-                    ShowError(funcname, 'img2pdf Error: ' + str(e))
+                    FailPipeline(pipeline, 'PDF Merge Error on Page ' + str(pipeline['merged']+1) + ': ' + str(e))
+                    break
+                finally:
+                    ReleasePage(pipeline, page)
+                PageDone(pipeline, pipeline['merged'])
+                pipeline['merged'] += 1
+        if pipeline['abort'].is_set() or pipeline['merged'] == pipeline['dropped']:
+            return
+        if pending:
+            FailPipeline(pipeline, 'PDF Merge Error: Page ' + str(pipeline['merged']+1) + ' is Missing')
+            return
+        try:
+            TimedCall(pipeline['timings'], 'merge', writer.write, pipeline['partfile'])
+        except Exception as e:
+            FailPipeline(pipeline, 'PDF Merge Error: ' + str(e))
+
+    def MergePage(writer, pdffile, fonts, imagedata=None):
+        # Append the Pages of a PDF File to the Output Document and Return the Number of Characters of Text
+        #    Every tesseract Page Embeds the Same Font - Fonts Already in the Output are Shared Instead of Copied
+        #    Given the Encoded Page Image, the (Text-Only) OCR Page is Laid Over It - Blank Pages Have No OCR Page
+        chars = 0
+        pages = pypdf.PdfReader(pdffile).pages if pdffile is not None else []
+        if imagedata is not None:
+            imagepage = pypdf.PdfReader(io.BytesIO(img2pdf.convert(imagedata))).pages[0]
+            if pages:
+                textpage = pages[0]
+                scale = pypdf.Transformation().scale(
+                    float(imagepage.mediabox.width) / float(textpage.mediabox.width),
+                    float(imagepage.mediabox.height) / float(textpage.mediabox.height))
+                imagepage.merge_transformed_page(textpage, scale)
+            pages = [imagepage]
+        for page in pages:
+            chars += len(''.join(page.extract_text().split()))
+            resources = page.get('/Resources')
+            pagefonts = resources.get_object().get('/Font') if resources is not None else None
+            pagefonts = pagefonts.get_object() if pagefonts is not None else {}
+            digests = {}
+            for name in list(pagefonts):
+                digest = hashlib.sha1()
+                DigestObject(pagefonts[name], digest)
+                digests[name] = digest.hexdigest()
+                if digests[name] in fonts:
+                    # An Object Already Belonging to the Output Document is Referenced, Not Copied
+                    pagefonts[pypdf.generic.NameObject(name)] = fonts[digests[name]]
+            newpage = writer.add_page(page)
+            if digests:
+                newfonts = newpage['/Resources']['/Font']
+                for name, digest in digests.items():
+                    fonts.setdefault(digest, newfonts.raw_get(name))
+
+        return(chars)
+
+    def DigestObject(obj, digest, depth=0):
+        # Add a PDF Object and Everything It References to a Hash, Used to Recognize Identical Fonts
+        if depth > 8:
+            return
+        obj = obj.get_object()
+        if isinstance(obj, pypdf.generic.StreamObject):
+            digest.update(obj.get_data())
+        if isinstance(obj, pypdf.generic.DictionaryObject):
+            for key in sorted(obj):
+                if key != '/Parent':
+                    digest.update(key.encode('utf-8'))
+                    DigestObject(obj[key], digest, depth + 1)
+        elif isinstance(obj, pypdf.generic.ArrayObject):
+            for item in obj:
+                DigestObject(item, digest, depth + 1)
+        else:
+            digest.update(repr(obj).encode('utf-8'))
+
+    def StageClock():
+        # Start Timing a Pipeline Stage - Wall Time and CPU Time of the Calling Thread
+        return((time.perf_counter(), time.thread_time()))
+
+    def RecordStage(timings, stage, clock, metrics=None):
+        # Add the Time Since StageClock() to the Totals for a Stage, and to a Page's Metrics If Given
+        wall = time.perf_counter() - clock[0]
+        cpu = time.thread_time() - clock[1]
+        with timinglock:
+            totals = timings.setdefault(stage, {'wall': 0.0, 'cpu': 0.0, 'calls': 0})
+            totals['wall'] += wall
+            totals['cpu'] += cpu
+            totals['calls'] += 1
+            if metrics is not None:
+                metrics[stage] = metrics.get(stage, 0.0) + wall
+
+    def TimedCall(timings, stage, function, *args, metrics=None):
+        # Call a Function and Add Its Wall and CPU Time to the Totals for a Stage
+        clock = StageClock()
+        try:
+            return(function(*args))
+        finally:
+            RecordStage(timings, stage, clock, metrics)
+
+    def PageMetrics(pipeline, idx):
+        # Metrics Collected for One Page as It Moves Through the Pipeline
+        with timinglock:
+            return(pipeline['pagemetrics'].setdefault(idx, {}))
+
+    def CountWritten(pipeline, metrics, filename):
+        # Add the Size of a File Written to the Working Directory to the Page and Document Totals
+        size = os.path.getsize(filename)
+        with timinglock:
+            metrics['written'] = metrics.get('written', 0) + size
+            pipeline['written'] += size
+
+    def PageDone(pipeline, idx):
+        # Report a Page's Stage Times Once It Leaves the Last Stage
+        metrics = PageMetrics(pipeline, idx)
+        parts = [stage + ' ' + '{:.2f}'.format(metrics[stage]) + 's'
+                 for stage in ('acquire', 'crop', 'deskew', 'encode', 'ocr', 'merge') if stage in metrics]
+        if 'class' in metrics:
+            parts.append(metrics['class'])
+        if 'blank' in metrics:
+            parts.append('blank page ' + metrics['blank'])
+        if metrics.get('ocrcache'):
+            parts.append('OCR cached')
+        if 'chars' in metrics:
+            parts.append(str(metrics['chars']) + ' OCR chars')
+        parts.append(FormatBytes(metrics.get('written', 0)) + ' written')
+        pipeline['status'].put('  Page ' + str(idx+1) + ': ' + ', '.join(parts) + '\n')
+        WriteMetrics('page', outfile=pipeline['outfile'], page=idx+1,
+                     **{key: round(value, 4) if isinstance(value, float) else value for key, value in metrics.items()})
+
+    def ReportDocumentMetrics(window, pipeline, numpages):
+        # Show Stage Totals for the Document in the Output Field and Record Them in the Metrics File
+        elapsed = time.perf_counter() - pipeline['started']
+        chars = sum(metrics.get('chars', 0) for metrics in pipeline['pagemetrics'].values())
+        lines = ['\nStage Times (Wall / CPU):\n']
+        for stage, totals in sorted(pipeline['timings'].items()):
+            lines.append('\t' + stage + ': ' + '{:.2f}'.format(totals['wall']) + 's / ' +
+                         '{:.2f}'.format(totals['cpu']) + 's\n')
+        peak = PeakMemory()
+        lines.append('\tTotal: ' + '{:.2f}'.format(elapsed) + 's for ' + str(numpages) + ' Page(s), ' +
+                     FormatBytes(pipeline['written']) + ' Written to Working Directory' +
+                     (', ' + str(chars) + ' OCR Characters' if chars else '') +
+                     (', Peak Memory ' + str(peak) + ' MB' if peak else '') + '\n')
+        UpdateOutput(window, ''.join(lines))
+        WriteMetrics('document', outfile=pipeline['outfile'], pages=numpages, seconds=round(elapsed, 4),
+                     written=pipeline['written'], chars=chars, peak_rss_mb=peak,
+                     stages={stage: {key: round(value, 4) for key, value in totals.items()}
+                             for stage, totals in pipeline['timings'].items()})
+
+    def FormatBytes(size):
+        # Format a Byte Count for the Output Field
+        for unit in ('B', 'KB', 'MB'):
+            if size < 1024:
+                return(str(round(size, 1)) + ' ' + unit)
+            size /= 1024.0
+        return(str(round(size, 1)) + ' GB')
+
+    def WriteMetrics(kind, **fields):
+        # Record Instrumentation in the Metrics File If One Was Given
+        #    JSON Lines Get One Record per Page, Document and Command; a Prometheus Textfile
+        #    (*.prom) is Rewritten with Gauges for the Last Document Completed
+        if not options['metrics']:
+            return
+        try:
+            with metricslock:
+                if options['metrics'].endswith('.prom'):
+                    if kind == 'document':
+                        WritePrometheusMetrics(options['metrics'], fields)
                     return
-            # Verify Output File was Created
-            if os.path.isfile(outfile) == False:
-                # Display an Error and Return
-                UpdateOutput(window, '\nUnable to Locate Output PDF File!\n')
-                ShowError(funcname, 'Unable to Locate Output PDF File!')
-                return
-            UpdateOutput(window, '\nDocument Saved to: ' + outfile + '\n')
-            # Cleanup Working Files and Directory
-            shutil.rmtree(workdir)
-            # Announce Completion
-            PlaySound('complete')
+                record = {'time': datetime.datetime.now().isoformat(timespec='milliseconds'), 'kind': kind}
+                record.update(fields)
+                with open(options['metrics'], 'a') as f:
+                    f.write(json.dumps(record) + '\n')
         except Exception as e:
-            ShowError(funcname, 'Error: ' + str(e))
+            options['metrics'] = None    # Report Once and Stop Trying
+            UpdateOutput(None, 'Unable to Write Metrics File: ' + str(e) + '\n')
+
+    def WritePrometheusMetrics(filename, fields):
+        # Replace a Prometheus Textfile Collector File with Metrics for the Last Document
+        lines = [
+            '# HELP scan2pdf_last_document_pages Pages in the last document saved.',
+            '# TYPE scan2pdf_last_document_pages gauge',
+            'scan2pdf_last_document_pages ' + str(fields['pages']),
+            '# HELP scan2pdf_last_document_seconds Wall time to scan and save the last document.',
+            '# TYPE scan2pdf_last_document_seconds gauge',
+            'scan2pdf_last_document_seconds ' + str(fields['seconds']),
+            '# HELP scan2pdf_last_document_written_bytes Bytes written to the working directory.',
+            '# TYPE scan2pdf_last_document_written_bytes gauge',
+            'scan2pdf_last_document_written_bytes ' + str(fields['written']),
+            '# HELP scan2pdf_last_document_ocr_chars Characters recognized by OCR.',
+            '# TYPE scan2pdf_last_document_ocr_chars gauge',
+            'scan2pdf_last_document_ocr_chars ' + str(fields['chars']),
+            '# HELP scan2pdf_last_document_stage_seconds Wall time spent in each pipeline stage.',
+            '# TYPE scan2pdf_last_document_stage_seconds gauge',
+        ]
+        for stage, totals in sorted(fields['stages'].items()):
+            lines.append('scan2pdf_last_document_stage_seconds{stage="' + stage + '"} ' + str(totals['wall']))
+        lines += [
+            '# HELP scan2pdf_last_document_timestamp_seconds When the last document was saved.',
+            '# TYPE scan2pdf_last_document_timestamp_seconds gauge',
+            'scan2pdf_last_document_timestamp_seconds ' + str(round(time.time(), 3)),
+        ]
+        # Write Then Rename so the Collector Never Reads a Partial File
+        with open(filename + '.tmp', 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(filename + '.tmp', filename)
+
+    def FailPipeline(pipeline, errtext):
+        # Record the First Error and Stop the Remaining Work - Pages Already Running Finish Quietly
+        with pipeline['lock']:
+            if pipeline['error'] is None:
+                pipeline['error'] = errtext
+                pipeline['status'].put('\n' + errtext + '\n')
+            pipeline['abort'].set()
+            futures = list(pipeline['futures'])
+        # Cancelled Outside the Lock - Cancelling Runs a Queued Page's Callback Here, and It Takes the Lock
+        for future in futures:
+            future.cancel()
+
+    def DrainPipelineStatus(window, pipeline):
+        # Copy Status Lines Posted by the Background Stages to the Output Field
+        lines = []
+        while True:
+            try:
+                lines.append(pipeline['status'].get_nowait())
+            except queue.Empty:
+                break
+        if lines:
+            UpdateOutput(window, ''.join(lines))
+
+    def StopPipeline(pipeline):
+        # Stop the Background Stages Without Waiting for Queued Pages
+        FailPipeline(pipeline, 'Scan Cancelled')
+        pipeline['encode'].put(None)
+        pipeline['merge'].put(None)
+        if pipeline['pool'] is not None and not pipeline['sharedpool']:
+            pipeline['pool'].shutdown(wait=False)
+
+    def FinishPipeline(window, funcname, pipeline):
+        # Wait for Every Page to Clear the Pipeline and Return the Output Files in Page Order
+        #    Returns None If Any Stage Failed
+        while True:
+            try:
+                pipeline['encode'].put(None, timeout=0.1)
+                break
+            except queue.Full:
+                DrainPipelineStatus(window, pipeline)
+        while pipeline['encoder'].is_alive():
+            pipeline['encoder'].join(0.1)
+            DrainPipelineStatus(window, pipeline)
+        if pipeline['pool'] is not None:
+            with pipeline['lock']:
+                futures = list(pipeline['futures'])
+            if futures:
+                UpdateOutput(window, '\nWaiting for OCR to Finish...\n')
+            for future in futures:
+                while not future.done():
+                    concurrent.futures.wait([future], timeout=0.1)
+                    DrainPipelineStatus(window, pipeline)
+            # A Shared Pool is Not Shut Down Here - Wait for the Callbacks Collecting the Last Pages
+            while True:
+                with pipeline['lock']:
+                    if pipeline['collected'] >= len(pipeline['futures']):
+                        break
+                sleep(0.01)
+            if not pipeline['sharedpool']:
+                pipeline['pool'].shutdown(wait=True)
+        if pipeline['merger'] is not None:
+            pipeline['merge'].put(None)
+            while pipeline['merger'].is_alive():
+                pipeline['merger'].join(0.1)
+                DrainPipelineStatus(window, pipeline)
+        DrainPipelineStatus(window, pipeline)
+        if pipeline['error'] is not None:
+            ShowError(funcname, pipeline['error'])
+            return None
+
+        return([pipeline['results'][idx] for idx in sorted(pipeline['results'])])
 
     def ViewDocument(window, document):
         # View the Output Document If it Exists
@@ -397,7 +2418,10 @@ def main(args):
         #    Custom Sound Files May Be Placed in the Script Directory
         #        Linux - bell.oga, complete.oga
         #        Windows    - chord.wav, complete.wav
+        if options['headless']:
+            return
         try:
+            from playsound import playsound
             # Path to Currently Running Script
             scriptpath = os.path.dirname(os.path.realpath(__file__))
             # Path to Sound Files - Linux
@@ -428,21 +2452,43 @@ def main(args):
         try:
             if errtext is not None:
                 if parse == True:
-                    ndx = errtext.lower().find('error')
-                    if ndx > -1:
-                        errtext = errtext[ndx:(len(errtext) - 1)]
-                        result = True
-                    elif errtext.lower().find('not found') > -1:
-                        result = True
-                    else:
+                    errtext = ParseCommandError(errtext)
+                    if errtext is None:
                         return(False)
+                    result = True
+                # A Job's Errors are Kept with the Job, and Its Popup Names the Job
+                job = getattr(jobcontext, 'job', None)
+                if job is not None:
+                    job['errors'].append(errtext)
+                    funcname = funcname + ' - Job ' + str(job['id'])
+                if options['headless']:
+                    if job is None:
+                        failures.append(errtext)
+                    LogEvent('error', function=funcname, message=CleanCommandOutput(errtext).strip())
+                    return(result)
                 PlaySound()    # Play Default System Sound to Announce Error
-                sg.Popup(funcname, CleanCommandOutput(errtext))
+                # Shown by the Window Thread - Errors are Usually Reported from a Scan Job's Thread
+                uievents.put(('popup', funcname, CleanCommandOutput(errtext)))
         except Exception as e:
-            sg.Popup('ShowError', 'Error: ' + str(e))
+            if options['headless']:
+                LogEvent('error', function='ShowError', message=str(e))
+            else:
+                sg.Popup('ShowError', 'Error: ' + str(e))
 
         return(result)
 
+    def ParseCommandError(cmdoutput):
+        # Return the Error Portion of Command Subprocess Output, or None If No Error Was Reported
+        if cmdoutput is None:
+            return None
+        ndx = cmdoutput.lower().find('error')
+        if ndx > -1:
+            return(cmdoutput[ndx:(len(cmdoutput) - 1)])
+        elif cmdoutput.lower().find('not found') > -1:
+            return(cmdoutput)
+
+        return None
+
     def CleanCommandOutput(txt):
         # Remove Extraneous Text from Command Subprocess Output
         try:
@@ -459,14 +2505,28 @@ def main(args):
         # Update the Output Field on the window
         try:
             if window is None:
+                # Headless - Write Each Non-Blank Status Line to the Log, and Keep the Last as a Job's Status
+                job = getattr(jobcontext, 'job', None)
+                logging = options['headless'] and options['log_status']
+                if (logging or job is not None) and updatetxt is not None:
+                    for line in CleanCommandOutput(updatetxt).splitlines():
+                        if line.strip():
+                            if job is not None:
+                                job['status'] = line.strip()
+                            if logging:
+                                LogEvent('status', message=line.strip())
                 return
-            txt = ''
-            if updatetxt is not None:
-                txt = updatetxt
-            window.FindElement(key).Update(disabled=False)
-            window.FindElement(key).Update(value=CleanCommandOutput(txt), append=append_flag)
-            window.FindElement(key).Update(disabled=True)
-            window.Refresh()
+            # Lines from a Scan Job are Tagged with Its Number, as Several Jobs Can Report at Once
+            #    A Job Clears the Output Only When No Other Job is Under Way, so Their Lines are Kept
+            job = getattr(jobcontext, 'job', None)
+            if job is not None and not append_flag:
+                with scheduler['lock']:
+                    append_flag = any(other is not job and other['finished'] is None for other in scheduler['jobs'])
+            if job is not None and updatetxt:
+                updatetxt = ''.join(('[Job ' + str(job['id']) + '] ' + line) if line.strip() else line
+                                    for line in updatetxt.splitlines(True))
+            # Queued for the Window Thread, Which Draws Whatever Has Arrived Once per Frame
+            uievents.put(('output', key, updatetxt or '', append_flag))
         except Exception as e:
             sg.Popup('UpdateOutput', 'Error: ' + str(e))
 
@@ -475,22 +2535,44 @@ def main(args):
         try:
             # Recommended for String Input
             cmd = ' '.join(str(x) for x in [command, *args])
+            started = time.perf_counter()
             p = subprocess.Popen(
                 cmd, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
             # Get Command Output Line by Line
-            cmdoutput = ''
+            lines = []
             for line in p.stdout:
                 line = line.decode('utf-8')
-                cmdoutput += line
+                lines.append(line)
                 # Update the Output Field on the window with the Current Command Output Line
                 if update_form:
                     UpdateOutput(window, updatetxt=line, key='output')
+            cmdoutput = ''.join(lines)
+            returncode = p.wait()
+            elapsed = time.perf_counter() - started
+            # Record the Command Time in the Metrics File and Output Field
+            WriteMetrics('command', command=os.path.basename(str(command)), seconds=round(elapsed, 4),
+                         returncode=returncode, output_bytes=len(cmdoutput))
+            if update_form:
+                UpdateOutput(window, '  (' + os.path.basename(str(command)) + ': ' +
+                             '{:.2f}'.format(elapsed) + 's)\n')
 
             # Return the Command Output to the Caller
             return (cmdoutput)
         except:
             pass
 
+    # Benchmarks Always Use the Simulated Scanner
+    backend = None
+    try:
+        if not cmdargs.benchmark and cmdargs.ingest is None:
+            UseBackend(cmdargs.backend)
+    except (ValueError, OSError, ImportError) as e:
+        parser.error(str(e))
+    StartupMark('options')
+    if cmdargs.benchmark:
+        return(Benchmark())
+    if headless:
+        return(Headless())
     Launcher()
 
 